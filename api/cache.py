@@ -1,18 +1,181 @@
-from typing import List, Tuple, Dict, Any
+import asyncio
+import contextlib
+import os
+from typing import (
+    Coroutine,
+    List,
+    Tuple,
+    Dict,
+    Any,
+    Callable,
+    Hashable,
+    Mapping,
+    Optional,
+    TypeVar,
+    Union,
+)
 from datetime import datetime, timedelta
 
-from api.good_dates import good_dates as calculate_good_dates
+from api.config import settings
+from api.cache_backends import (
+    BACKEND_ERRORS,
+    CacheBackend,
+    TTLCache,
+    create_cache_backend,
+)
+from api.cache_snapshot import read_snapshot, write_snapshot
+from api.recommendation_cache import get_recommendation_cache_stats
 
-# Cache structure: {key: (result, timestamp)}
-_cache: Dict[str, Tuple[Tuple[List[str], int, str, Dict[str, Any]], float]] = {}
-CACHE_DURATION = timedelta(hours=24)
+from api.good_dates import calculate_dates_for_number, calculate_zodiac_info
+from api.numerology import calculate_life_path_number
+from api.numerology_kernel import MAX_DATE_DIGIT_SUM
+from api.logger import logger
 
+T = TypeVar("T")
 
-def _make_cache_key(
-    birth_date: str, year: int, match_on_single_digit: bool, include_zodiac: bool
-) -> str:
-    """Create a unique cache key."""
-    return f"{birth_date}:{year}:{match_on_single_digit}:{include_zodiac}"
+NumerologyResult = Tuple[List[str], int, str]
+GoodDatesResult = Tuple[List[str], int, str, Optional[Mapping[str, Any]]]
+# (birth_date, year, match_on_single_digit, include_zodiac)
+GoodDatesQuery = Tuple[str, int, bool, bool]
+
+
+# Numerology layer: dates depend only on the reduced number, year and mode,
+# so results are deterministic and never expire.
+# Cache structure: {(life_path_number, year, match_on_single_digit): result}
+_numerology_cache = TTLCache(
+    ttl=None, max_entries=settings.numerology_cache_max_entries
+)
+
+# Zodiac layer: per-user zodiac info and AI recommendations, kept in the
+# configured backend so it can be shared across worker processes.
+# Cache structure: {key: zodiac_info}
+CACHE_DURATION = timedelta(seconds=settings.cache_ttl_seconds)
+_cache: CacheBackend = create_cache_backend(settings)
+_sweeper_task: Optional["asyncio.Task[None]"] = None
+_snapshot_task: Optional["asyncio.Task[None]"] = None
+_prewarm_task: Optional["asyncio.Task[None]"] = None
+_prewarmed = asyncio.Event()
+
+# Computations in progress, shared by every caller missing the same key
+_inflight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+
+
+def _make_cache_key(birth_date: str, year: int, match_on_single_digit: bool) -> str:
+    """Create a unique zodiac layer cache key."""
+    return f"{birth_date}:{year}:{match_on_single_digit}"
+
+
+def _log_refresh_failure(task: "asyncio.Task[Any]") -> None:
+    """Consume and log the outcome of a computation nobody may be awaiting."""
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Cache computation failed: {str(task.exception())}")
+
+
+def _start_single_flight(
+    key: Hashable, compute: Callable[[], Coroutine[Any, Any, T]]
+) -> "asyncio.Task[T]":
+    """Get the in-flight computation for a key, starting one if there is none."""
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(compute())
+        _inflight[key] = task
+
+        def _finish(done: "asyncio.Task[Any]") -> None:
+            if _inflight.get(key) is done:
+                del _inflight[key]
+            _log_refresh_failure(done)
+
+        task.add_done_callback(_finish)
+    return task
+
+
+async def single_flight(
+    key: Hashable, compute: Callable[[], Coroutine[Any, Any, T]]
+) -> T:
+    """Run ``compute`` once per key however many callers miss concurrently.
+
+    Every caller awaits the same task. The task is shielded, so a cancelled
+    caller does not cancel the computation for the others, and an exception
+    raised by the computation propagates to every caller.
+    """
+    return await asyncio.shield(_start_single_flight(key, compute))
+
+
+def get_cached_numerology_dates(
+    number: int, year: int, match_on_single_digit: bool
+) -> NumerologyResult:
+    """Get cached good dates for a reduced life path number."""
+    key = (number, year, match_on_single_digit)
+    result: Optional[NumerologyResult] = _numerology_cache.get(key)
+    if result is None:
+        result = calculate_dates_for_number(number, year, match_on_single_digit)
+        _numerology_cache.set(key, result)
+    return result
+
+
+async def _in_cache(func: Callable[..., T], *args: Any) -> T:
+    """Run a zodiac cache operation, off the event loop if the backend blocks."""
+    if _cache.blocking:
+        return await asyncio.to_thread(func, *args)
+    return func(*args)
+
+
+async def _read_cache(
+    read: Callable[[str], Any], key: str
+) -> Optional[Mapping[str, Any]]:
+    """Read the zodiac cache, treating a failing backend as a miss."""
+    try:
+        zodiac_info: Optional[Mapping[str, Any]] = await _in_cache(read, key)
+    except BACKEND_ERRORS as e:
+        logger.warning(f"Zodiac cache read failed, treating it as a miss: {e}")
+        return None
+    return zodiac_info
+
+
+async def _write_cache(key: str, zodiac_info: Mapping[str, Any]) -> None:
+    """Write the zodiac cache, skipping the write if the backend fails."""
+    try:
+        await _in_cache(_cache.set, key, zodiac_info)
+    except BACKEND_ERRORS as e:
+        logger.warning(f"Zodiac cache write failed, skipping it: {e}")
+
+
+async def peek_cached_zodiac_info(
+    birth_date: str, year: int, match_on_single_digit: bool
+) -> Optional[Mapping[str, Any]]:
+    """Get fresh cached zodiac information without computing it on a miss."""
+    return await _read_cache(
+        _cache.get, _make_cache_key(birth_date, year, match_on_single_digit)
+    )
+
+
+async def get_cached_zodiac_info(
+    birth_date: str,
+    year: int,
+    match_on_single_digit: bool,
+    numerology_number: int,
+    dates: List[str],
+) -> Mapping[str, Any]:
+    """Get cached zodiac information and recommendations for a birth date."""
+    cache_key = _make_cache_key(birth_date, year, match_on_single_digit)
+
+    # Check if we have a valid cached result
+    zodiac_info = await _read_cache(_cache.get, cache_key)
+    if zodiac_info is not None:
+        return zodiac_info
+
+    async def compute() -> Mapping[str, Any]:
+        result = await calculate_zodiac_info(birth_date, year, numerology_number, dates)
+        await _write_cache(cache_key, result)
+        return result
+
+    # Serve an expired value while a single background task refreshes it
+    zodiac_info = await _read_cache(_cache.get_stale, cache_key)
+    if zodiac_info is not None:
+        _start_single_flight(cache_key, compute)
+        return zodiac_info
+
+    return await single_flight(cache_key, compute)
 
 
 async def get_cached_good_dates(
@@ -20,37 +183,247 @@ async def get_cached_good_dates(
     year: int,
     match_on_single_digit: bool,
     include_zodiac: bool = False,
-) -> Tuple[List[str], int, str, Dict[str, Any]]:
+) -> GoodDatesResult:
     """Get cached good dates calculation results."""
-    cache_key = _make_cache_key(birth_date, year, match_on_single_digit, include_zodiac)
-    now = datetime.now().timestamp()
+    number = calculate_life_path_number(birth_date, match_on_single_digit)
+    dates, number, meaning = get_cached_numerology_dates(
+        number, year, match_on_single_digit
+    )
+    if not include_zodiac:
+        return dates, number, meaning, None
 
-    # Check if we have a valid cached result
-    if cache_key in _cache:
-        result, timestamp = _cache[cache_key]
-        if now - timestamp < CACHE_DURATION.total_seconds():
-            return result
-
-    # Calculate new result
-    result = await calculate_good_dates(
-        birth_date=birth_date,
-        year=year,
-        match_on_single_digit=match_on_single_digit,
-        include_zodiac=include_zodiac,
+    zodiac_info = await get_cached_zodiac_info(
+        birth_date, year, match_on_single_digit, number, dates
     )
+    return dates, number, meaning, zodiac_info
 
-    # Cache the result
-    _cache[cache_key] = (result, now)
-    return result
+
+async def get_cached_good_dates_batch(
+    queries: List[GoodDatesQuery],
+) -> List[Union[GoodDatesResult, Exception]]:
+    """Get good dates for many queries, computing each numerology group once.
+
+    Results are returned in input order. A query that fails yields its
+    exception in place of a result instead of failing the whole batch.
+    """
+    results: List[Optional[Union[GoodDatesResult, Exception]]] = [None] * len(queries)
+    zodiac_queries: List[Tuple[int, NumerologyResult]] = []
+
+    # Queries sharing (life path number, year, mode) hit the numerology layer
+    for index, (birth_date, year, match_on_single_digit, include_zodiac) in enumerate(
+        queries
+    ):
+        try:
+            number = calculate_life_path_number(birth_date, match_on_single_digit)
+            numerology = get_cached_numerology_dates(
+                number, year, match_on_single_digit
+            )
+        except (ValueError, OverflowError) as e:
+            results[index] = e
+            continue
+        if include_zodiac:
+            zodiac_queries.append((index, numerology))
+        else:
+            results[index] = (*numerology, None)
+
+    zodiac_results = await asyncio.gather(
+        *(
+            get_cached_zodiac_info(
+                queries[index][0], queries[index][1], queries[index][2], number, dates
+            )
+            for index, (dates, number, _) in zodiac_queries
+        ),
+        return_exceptions=True,
+    )
+    for (index, (dates, number, meaning)), zodiac_info in zip(
+        zodiac_queries, zodiac_results, strict=True
+    ):
+        if isinstance(zodiac_info, Exception):
+            results[index] = zodiac_info
+        elif isinstance(zodiac_info, BaseException):
+            raise zodiac_info
+        else:
+            results[index] = (dates, number, meaning, zodiac_info)
+
+    return results  # type: ignore[return-value]
+
+
+def prewarm_numerology_year(year: int) -> int:
+    """Fill the numerology layer for every life path number in a year.
+
+    Covers 1-9 in single-digit mode and every possible unreduced digit sum
+    in full mode. Returns the number of entries computed.
+    """
+    computed = 0
+    for match_on_single_digit, numbers in (
+        (True, range(1, 10)),
+        (False, range(1, MAX_DATE_DIGIT_SUM + 1)),
+    ):
+        for number in numbers:
+            if (number, year, match_on_single_digit) not in _numerology_cache:
+                get_cached_numerology_dates(number, year, match_on_single_digit)
+                computed += 1
+    return computed
 
 
-def clear_expired_cache() -> None:
+async def _prewarm(years: List[int]) -> None:
+    """Prewarm the numerology layer one year at a time, then mark it ready."""
+    for year in years:
+        computed = prewarm_numerology_year(year)
+        logger.info(f"Prewarmed {computed} numerology cache entries for {year}")
+        await asyncio.sleep(0)
+    _prewarmed.set()
+
+
+def start_cache_prewarm() -> None:
+    """Start prewarming the numerology layer for the current and coming years."""
+    global _prewarm_task
+    if not settings.cache_prewarm:
+        _prewarmed.set()
+        return
+    if _prewarm_task is None or _prewarm_task.done():
+        current_year = datetime.now().year
+        years = list(
+            range(current_year, current_year + settings.cache_prewarm_years_ahead + 1)
+        )
+        _prewarm_task = asyncio.create_task(_prewarm(years))
+
+
+def is_cache_ready() -> bool:
+    """Whether startup prewarming has finished."""
+    return _prewarmed.is_set()
+
+
+async def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Get size, hit rate and eviction counters for each cache layer."""
+    stats = {
+        "numerology": _numerology_cache.stats(),
+        "zodiac": await _in_cache(_cache.stats),
+    }
+    recommendation_stats = await asyncio.to_thread(get_recommendation_cache_stats)
+    if recommendation_stats is not None:
+        stats["recommendations"] = recommendation_stats
+    return stats
+
+
+async def clear_expired_cache() -> None:
     """Clear expired cache entries."""
-    now = datetime.now().timestamp()
-    expired_keys = [
-        key
-        for key, (_, timestamp) in _cache.items()
-        if now - timestamp >= CACHE_DURATION.total_seconds()
-    ]
-    for key in expired_keys:
-        del _cache[key]
+    await _in_cache(_cache.sweep)
+
+
+async def _sweep_periodically(interval: float) -> None:
+    """Drop expired entries every ``interval`` seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            removed = await _in_cache(_cache.sweep)
+        except BACKEND_ERRORS as e:
+            logger.warning(f"Cache sweep failed, retrying next interval: {e}")
+            continue
+        if removed:
+            logger.info(f"Cache sweeper removed {removed} expired entries")
+
+
+def start_cache_sweeper() -> None:
+    """Start the background task that drops expired cache entries."""
+    global _sweeper_task
+    if _sweeper_task is None or _sweeper_task.done():
+        _sweeper_task = asyncio.create_task(
+            _sweep_periodically(settings.cache_sweep_interval_seconds)
+        )
+
+
+async def stop_cache_sweeper() -> None:
+    """Stop the background cache sweeper task."""
+    global _sweeper_task
+    if _sweeper_task is not None:
+        _sweeper_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await _sweeper_task
+        _sweeper_task = None
+
+
+def save_cache_snapshot(path: str) -> int:
+    """Write live in-memory zodiac cache entries to a snapshot file."""
+    if not isinstance(_cache, TTLCache):
+        return 0
+    assert _cache.ttl is not None
+    oldest = _cache.clock() - _cache.ttl - _cache.stale_ttl
+    return write_snapshot(
+        (
+            (str(key), value, stored_at)
+            for key, value, stored_at in _cache.items()
+            if stored_at > oldest
+        ),
+        path,
+    )
+
+
+async def restore_cache_snapshot(path: str, chunk_size: int = 500) -> int:
+    """Load a snapshot into the in-memory zodiac cache, skipping expired entries.
+
+    Records are streamed from disk and control returns to the event loop
+    every ``chunk_size`` entries, so a large snapshot never blocks serving.
+    Entries computed since startup are kept over their snapshot versions.
+    """
+    if not isinstance(_cache, TTLCache) or not os.path.exists(path):
+        return 0
+    assert _cache.ttl is not None
+    oldest = _cache.clock() - _cache.ttl - _cache.stale_ttl
+
+    restored = 0
+    entries = read_snapshot(path, min_stored_at=oldest)
+    for count, (key, value, stored_at) in enumerate(entries, 1):
+        if key not in _cache:
+            _cache.set(key, value, stored_at=stored_at)
+            restored += 1
+        if count % chunk_size == 0:
+            await asyncio.sleep(0)
+    return restored
+
+
+async def _snapshot_periodically(path: str, interval: float) -> None:
+    """Restore the last snapshot, then write a new one every ``interval`` seconds."""
+    try:
+        restored = await restore_cache_snapshot(path)
+        logger.info(f"Restored {restored} cache entries from {path}")
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not restore cache snapshot: {str(e)}")
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(save_cache_snapshot, path)
+        except OSError as e:
+            logger.error(f"Could not write cache snapshot: {str(e)}")
+
+
+def start_cache_snapshots() -> None:
+    """Start restoring and periodically snapshotting the in-memory cache."""
+    global _snapshot_task
+    if not settings.cache_snapshot_path or not isinstance(_cache, TTLCache):
+        return
+    if _snapshot_task is None or _snapshot_task.done():
+        _snapshot_task = asyncio.create_task(
+            _snapshot_periodically(
+                settings.cache_snapshot_path,
+                settings.cache_snapshot_interval_seconds,
+            )
+        )
+
+
+async def stop_cache_snapshots() -> None:
+    """Stop periodic snapshots and write a final snapshot."""
+    global _snapshot_task
+    if _snapshot_task is None:
+        return
+    _snapshot_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await _snapshot_task
+    _snapshot_task = None
+
+    try:
+        saved = save_cache_snapshot(settings.cache_snapshot_path)
+        logger.info(f"Saved {saved} cache entries to {settings.cache_snapshot_path}")
+    except OSError as e:
+        logger.error(f"Could not write cache snapshot: {str(e)}")
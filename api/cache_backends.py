@@ -0,0 +1,645 @@
+import json
+import socket
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+from urllib.parse import urlparse
+
+from api.config import Settings
+
+# Values larger than this are zlib-compressed before being stored
+COMPRESS_THRESHOLD = 512
+_RAW, _COMPRESSED = b"j", b"z"
+
+
+def _to_json(value: Any) -> Any:
+    """Convert mappings and other JSON-compatible containers for encoding."""
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__} for the cache")
+
+
+def encode_value(value: Any) -> bytes:
+    """Serialize a cache value to compact JSON, compressing large payloads."""
+    payload = json.dumps(
+        value, separators=(",", ":"), ensure_ascii=False, default=_to_json
+    ).encode()
+    if len(payload) > COMPRESS_THRESHOLD:
+        return _COMPRESSED + zlib.compress(payload)
+    return _RAW + payload
+
+
+def decode_value(data: bytes) -> Any:
+    """Deserialize a value produced by :func:`encode_value`."""
+    marker, payload = data[:1], data[1:]
+    if marker == _COMPRESSED:
+        payload = zlib.decompress(payload)
+    elif marker != _RAW:
+        raise ValueError("Unknown cache value encoding")
+    return json.loads(payload)
+
+
+class CacheBackend(ABC):
+    """Storage for TTL cache entries.
+
+    ``get`` only returns values younger than the TTL. ``get_stale`` also
+    returns values within the stale window after it, for
+    stale-while-revalidate.
+    """
+
+    ttl: Optional[float]
+    stale_ttl: float
+    # Whether operations do blocking I/O and should run off the event loop
+    blocking = False
+
+    @abstractmethod
+    def get(self, key: str) -> Any:
+        """Get a live value, or None on a miss."""
+
+    @abstractmethod
+    def get_stale(self, key: str) -> Any:
+        """Get a value past its TTL but within the stale window, or None."""
+
+    @abstractmethod
+    def set(self, key: str, value: Any) -> None:
+        """Store a value."""
+
+    @abstractmethod
+    def sweep(self) -> int:
+        """Drop expired entries and return how many were removed."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every entry."""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Get size and hit/miss counters."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+
+def _estimate_size(value: Any, seen: Optional[Set[int]] = None) -> int:
+    """Approximate the memory footprint of a cached value in bytes."""
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    size = sys.getsizeof(value)
+    if isinstance(value, Mapping):
+        size += sum(
+            _estimate_size(k, seen) + _estimate_size(v, seen) for k, v in value.items()
+        )
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_estimate_size(item, seen) for item in value)
+    return size
+
+
+class TTLCache(CacheBackend):
+    """LRU cache with optional per-entry expiry and a memory budget.
+
+    Entries are evicted least recently used first once either ``max_entries``
+    or the approximate ``max_bytes`` is exceeded. Expired entries are kept for
+    a further ``stale_ttl`` seconds so :meth:`get_stale` can still serve them,
+    then dropped when read and by :meth:`sweep`.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float],
+        max_entries: int,
+        max_bytes: Optional[int] = None,
+        stale_ttl: float = 0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.clock = clock
+        # {key: (value, stored_at, size)}
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, int]]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def _is_stale(self, stored_at: float, now: float) -> bool:
+        return self.ttl is not None and now - stored_at >= self.ttl
+
+    def _is_expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl is not None and now - stored_at >= self.ttl + self.stale_ttl
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, size = self._entries.pop(key)
+        self.bytes -= size
+
+    def get(self, key: Hashable) -> Any:
+        """Get a live value, or None on a miss."""
+        entry = self._entries.get(key)
+        now = self.clock()
+        if entry is not None and self._is_expired(entry[1], now):
+            self._remove(key)
+            self.expirations += 1
+            entry = None
+        if entry is None or self._is_stale(entry[1], now):
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def get_stale(self, key: Hashable) -> Any:
+        """Get a value past its TTL but within the stale window, or None."""
+        entry = self._entries.get(key)
+        if entry is None or self._is_expired(entry[1], self.clock()):
+            return None
+
+        self._entries.move_to_end(key)
+        self.stale_hits += 1
+        return entry[0]
+
+    def set(self, key: Hashable, value: Any, stored_at: Optional[float] = None) -> None:
+        """Store a value, evicting least recently used entries if over budget.
+
+        ``stored_at`` backdates the entry, e.g. when restoring a snapshot.
+        """
+        if key in self._entries:
+            self._remove(key)
+        size = _estimate_size(value) if self.max_bytes is not None else 0
+        if stored_at is None:
+            stored_at = self.clock()
+        self._entries[key] = (value, stored_at, size)
+        self.bytes += size
+
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self.bytes > self.max_bytes)
+        ):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def sweep(self) -> int:
+        """Drop expired entries and return how many were removed."""
+        now = self.clock()
+        expired = [
+            key
+            for key, (_, stored_at, _) in self._entries.items()
+            if self._is_expired(stored_at, now)
+        ]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        return len(expired)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+        self.bytes = 0
+
+    def items(self) -> Iterator[Tuple[Hashable, Any, float]]:
+        """Iterate over (key, value, stored_at) for every entry held."""
+        for key, (value, stored_at, _) in list(self._entries.items()):
+            yield key, value, stored_at
+
+    def stats(self) -> Dict[str, Any]:
+        """Get size, limit and hit/miss/eviction counters."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "bytes": self.bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stale_hits": self.stale_hits,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class SQLiteCache(CacheBackend):
+    """TTL cache stored in a SQLite database in WAL mode.
+
+    Every worker process opens the same file, so entries written by one are
+    visible to all. Least recently used rows are evicted beyond
+    ``max_entries``.
+    """
+
+    blocking = True
+    # Check the entry cap once per this many writes rather than on each one
+    EVICT_CHECK_INTERVAL = 100
+    # Write batched access times once this many hits are pending
+    TOUCH_FLUSH_SIZE = 100
+
+    def __init__(
+        self,
+        path: str,
+        ttl: Optional[float],
+        max_entries: int,
+        stale_ttl: float = 0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._writes = 0
+        # Access times of recent hits, written to the database in batches
+        self._touched: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+            "stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)"
+        )
+        self._db.commit()
+
+    def _age_limit(self) -> Optional[float]:
+        return None if self.ttl is None else self.ttl + self.stale_ttl
+
+    def _read(self, key: str, allow_stale: bool) -> Any:
+        now = self.clock()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, stored_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, stored_at = row
+            age = now - stored_at
+            limit = self.ttl if not allow_stale else self._age_limit()
+            if limit is not None and age >= limit:
+                return None
+            self._touched[key] = now
+            if len(self._touched) >= self.TOUCH_FLUSH_SIZE:
+                self._flush_touched()
+                self._db.commit()
+        return decode_value(value)
+
+    def _flush_touched(self) -> None:
+        """Write pending access times, so LRU order is current."""
+        if self._touched:
+            self._db.executemany(
+                "UPDATE cache SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def get(self, key: str) -> Any:
+        """Get a live value, or None on a miss."""
+        value = self._read(key, allow_stale=False)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def get_stale(self, key: str) -> Any:
+        """Get a value past its TTL but within the stale window, or None."""
+        value = self._read(key, allow_stale=True)
+        if value is not None:
+            self.stale_hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value, evicting least recently used rows if over the cap."""
+        now = self.clock()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cache (key, value, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, encode_value(value), now, now),
+            )
+            self._touched.pop(key, None)
+            self._writes += 1
+            if self._writes % self.EVICT_CHECK_INTERVAL == 0:
+                self._evict()
+            self._db.commit()
+
+    def _evict(self) -> None:
+        self._flush_touched()
+        (count,) = self._db.execute("SELECT COUNT(*) FROM cache").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM cache WHERE key IN "
+                "(SELECT key FROM cache ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            )
+            self.evictions += excess
+
+    def sweep(self) -> int:
+        """Drop expired rows, enforce the entry cap and return rows expired."""
+        limit = self._age_limit()
+        with self._lock:
+            removed = 0
+            if limit is not None:
+                removed = self._db.execute(
+                    "DELETE FROM cache WHERE stored_at <= ?", (self.clock() - limit,)
+                ).rowcount
+            self._evict()
+            self._db.commit()
+        self.expirations += removed
+        return removed
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._touched.clear()
+            self._db.execute("DELETE FROM cache")
+            self._db.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._db.execute("SELECT COUNT(*) FROM cache").fetchone()
+        return int(count)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get size, limit and this process's hit/miss/eviction counters."""
+        lookups = self.hits + self.misses
+        return {
+            "backend": "sqlite",
+            "size": len(self),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stale_hits": self.stale_hits,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def close(self) -> None:
+        """Write pending access times and close the database connection."""
+        with self._lock:
+            self._flush_touched()
+            self._db.commit()
+            self._db.close()
+
+
+class RedisError(Exception):
+    """Error reply or protocol failure from a Redis server."""
+
+
+# Errors a backend raises when its store is unreachable or failing
+BACKEND_ERRORS = (OSError, RedisError, sqlite3.Error)
+
+
+class RedisCache(CacheBackend):
+    """TTL cache stored in Redis, shared by every worker process.
+
+    Talks the Redis serialization protocol (RESP) over a single socket, so it
+    works with Redis and any compatible server. Entries expire server-side
+    after the TTL plus stale window; Redis' own maxmemory policy bounds size.
+    """
+
+    blocking = True
+    # Each stored value is prefixed with its write time as a big-endian double
+    _STORED_AT = struct.Struct(">d")
+    # Keys requested per SCAN call
+    SCAN_COUNT = 1000
+
+    def __init__(
+        self,
+        url: str,
+        ttl: Optional[float],
+        stale_ttl: float = 0,
+        prefix: str = "good-dates:",
+        socket_timeout: float = 2.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.password = parsed.password
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.prefix = prefix
+        self.socket_timeout = socket_timeout
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self._lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._reader: Any = None
+
+    def _connect(self) -> None:
+        self._sock = socket.create_connection(
+            (self.host, self.port), timeout=self.socket_timeout
+        )
+        self._reader = self._sock.makefile("rb")
+        if self.password:
+            self._send("AUTH", self.password)
+        if self.db:
+            self._send("SELECT", str(self.db))
+
+    def _disconnect(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+        self._sock = None
+        self._reader = None
+
+    def _send(self, *args: Union[str, bytes]) -> Any:
+        assert self._sock is not None
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg.encode() if isinstance(arg, str) else arg
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._sock.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _read_reply(self) -> Any:
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            raise RedisError(body.decode())
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(body)
+            if count < 0:
+                return None
+            return [self._read_reply() for _ in range(count)]
+        raise RedisError(f"Unexpected reply: {line!r}")
+
+    def execute(self, *args: Union[str, bytes]) -> Any:
+        """Run a command, reconnecting once if the connection dropped."""
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._send(*args)
+                except (ConnectionError, OSError):
+                    self._disconnect()
+                    if attempt:
+                        raise
+
+    def _read(self, key: str, allow_stale: bool) -> Any:
+        data = self.execute("GET", self.prefix + key)
+        if data is None:
+            return None
+        (stored_at,) = self._STORED_AT.unpack_from(data)
+        if not allow_stale and self.ttl is not None:
+            if self.clock() - stored_at >= self.ttl:
+                return None
+        return decode_value(data[self._STORED_AT.size :])
+
+    def get(self, key: str) -> Any:
+        """Get a live value, or None on a miss."""
+        value = self._read(key, allow_stale=False)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def get_stale(self, key: str) -> Any:
+        """Get a value past its TTL but within the stale window, or None."""
+        value = self._read(key, allow_stale=True)
+        if value is not None:
+            self.stale_hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value with a server-side expiry."""
+        data = self._STORED_AT.pack(self.clock()) + encode_value(value)
+        args: List[Union[str, bytes]] = ["SET", self.prefix + key, data]
+        if self.ttl is not None:
+            args += ["PX", str(int((self.ttl + self.stale_ttl) * 1000))]
+        self.execute(*args)
+
+    def sweep(self) -> int:
+        """Expiry is handled by Redis, so there is nothing to sweep."""
+        return 0
+
+    def _scan_keys(self) -> Iterator[List[bytes]]:
+        """Yield batches of this cache's keys.
+
+        Uses SCAN rather than KEYS, so the server is never blocked walking
+        the whole keyspace in one command.
+        """
+        cursor: Union[str, bytes] = "0"
+        while True:
+            cursor, keys = self.execute(
+                "SCAN",
+                cursor,
+                "MATCH",
+                self.prefix + "*",
+                "COUNT",
+                str(self.SCAN_COUNT),
+            )
+            if keys:
+                yield keys
+            if cursor == b"0":
+                return
+
+    def clear(self) -> None:
+        """Drop every entry under this cache's key prefix."""
+        for keys in self._scan_keys():
+            self.execute("DEL", *keys)
+
+    def __len__(self) -> int:
+        return sum(len(keys) for keys in self._scan_keys())
+
+    def stats(self) -> Dict[str, Any]:
+        """Get size and this process's hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "backend": "redis",
+            "size": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stale_hits": self.stale_hits,
+        }
+
+
+def create_cache_backend(settings: Settings) -> CacheBackend:
+    """Create the zodiac layer cache backend selected in settings."""
+    ttl = float(settings.cache_ttl_seconds)
+    stale_ttl = (
+        settings.cache_stale_ttl_seconds if settings.cache_stale_while_revalidate else 0
+    )
+    if settings.cache_backend == "memory":
+        return TTLCache(
+            ttl=ttl,
+            max_entries=settings.cache_max_entries,
+            max_bytes=settings.cache_max_bytes,
+            stale_ttl=stale_ttl,
+        )
+    if settings.cache_backend == "sqlite":
+        return SQLiteCache(
+            path=settings.cache_sqlite_path,
+            ttl=ttl,
+            max_entries=settings.cache_max_entries,
+            stale_ttl=stale_ttl,
+        )
+    if settings.cache_backend == "redis":
+        return RedisCache(
+            url=settings.cache_redis_url,
+            ttl=ttl,
+            stale_ttl=stale_ttl,
+            prefix=settings.cache_key_prefix,
+        )
+    raise ValueError(f"Unknown cache backend: {settings.cache_backend}")
@@ -0,0 +1,65 @@
+import os
+import struct
+from typing import Any, BinaryIO, Iterable, Iterator, Tuple
+
+from api.cache_backends import decode_value, encode_value
+
+# File layout: MAGIC, then one record per entry. Each record is a header of
+# (stored_at, key length, value length) followed by the UTF-8 key and the
+# value as produced by encode_value.
+MAGIC = b"GDCS\x01"
+_RECORD = struct.Struct(">dHI")
+
+SnapshotEntry = Tuple[str, Any, float]
+
+
+def write_snapshot(entries: Iterable[SnapshotEntry], path: str) -> int:
+    """Write (key, value, stored_at) entries to a snapshot file.
+
+    The file is written next to ``path`` and moved into place, so a crash
+    mid-write never leaves a truncated snapshot behind. Returns the number
+    of entries written.
+    """
+    tmp_path = f"{path}.tmp"
+    count = 0
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        for key, value, stored_at in entries:
+            key_bytes = key.encode()
+            value_bytes = encode_value(value)
+            f.write(_RECORD.pack(stored_at, len(key_bytes), len(value_bytes)))
+            f.write(key_bytes)
+            f.write(value_bytes)
+            count += 1
+    os.replace(tmp_path, path)
+    return count
+
+
+def _read_exact(f: BinaryIO, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated cache snapshot")
+    return data
+
+
+def read_snapshot(path: str, min_stored_at: float = 0.0) -> Iterator[SnapshotEntry]:
+    """Stream (key, value, stored_at) entries from a snapshot file.
+
+    Records are read one at a time. Entries stored before ``min_stored_at``
+    are skipped without decoding their values.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("Not a cache snapshot file")
+        while True:
+            header = f.read(_RECORD.size)
+            if not header:
+                return
+            if len(header) != _RECORD.size:
+                raise ValueError("Truncated cache snapshot")
+            stored_at, key_length, value_length = _RECORD.unpack(header)
+            if stored_at < min_stored_at:
+                f.seek(key_length + value_length, os.SEEK_CUR)
+                continue
+            key = _read_exact(f, key_length).decode()
+            yield key, decode_value(_read_exact(f, value_length)), stored_at
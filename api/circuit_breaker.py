@@ -0,0 +1,82 @@
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class CircuitBreaker:
+    """Stop calling a failing upstream until a trial request succeeds.
+
+    The breaker opens after ``failure_threshold`` consecutive failures. While
+    open every request is rejected; after ``reset_timeout`` seconds it goes
+    half-open and lets a single probe through. A successful probe closes it
+    again, a failed one re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._probe_started: Optional[float] = None
+
+    def allow_request(self) -> bool:
+        """Whether a request may go upstream now."""
+        if self.state == self.CLOSED:
+            return True
+
+        now = self.clock()
+        if self.state == self.OPEN and now - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._probe_started = None
+
+        # Half-open admits one probe; a probe that never reported back (e.g.
+        # it was cancelled) is replaced after another reset_timeout
+        if self.state == self.HALF_OPEN and (
+            self._probe_started is None
+            or now - self._probe_started >= self.reset_timeout
+        ):
+            self._probe_started = now
+            return True
+
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        """Record a successful upstream call, closing the breaker."""
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._probe_started = None
+
+    def record_failure(self) -> None:
+        """Record a failed or timed-out upstream call."""
+        self.consecutive_failures += 1
+        if (
+            self.state == self.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            if self.state != self.OPEN:
+                self.times_opened += 1
+            self.state = self.OPEN
+            self.opened_at = self.clock()
+            self._probe_started = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the breaker state and counters."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
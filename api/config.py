@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Literal, Optional
 from pydantic_settings import BaseSettings
 import logging
 
@@ -22,11 +22,72 @@ class Settings(BaseSettings):
     log_max_size: int = 10 * 1024 * 1024  # 10 MB
     log_backup_count: int = 5
 
+    # Cache settings
+    cache_backend: str = "memory"  # memory, sqlite or redis
+    cache_sqlite_path: str = "cache.db"
+    cache_redis_url: str = "redis://localhost:6379/0"
+    cache_key_prefix: str = "good-dates:"
+    cache_ttl_seconds: int = 24 * 60 * 60
+    cache_max_entries: int = 10000
+    cache_max_bytes: int = 256 * 1024 * 1024  # 256 MB
+    cache_sweep_interval_seconds: float = 300
+    cache_stale_while_revalidate: bool = False
+    cache_stale_ttl_seconds: int = 60 * 60
+    cache_snapshot_path: str = "cache.snapshot"  # empty disables snapshots
+    cache_snapshot_interval_seconds: float = 600
+    cache_prewarm: bool = True
+    cache_prewarm_years_ahead: int = 1
+    numerology_cache_max_entries: int = 20000
+
+    # Persistent AI completion cache, keyed by prompt fingerprint
+    recommendation_cache_path: str = "recommendations.db"  # empty disables it
+    recommendation_cache_ttl_seconds: int = 30 * 24 * 60 * 60
+    recommendation_cache_max_entries: int = 5000
+
+    # Batch settings
+    batch_max_items: int = 10000
+
+    # Range query settings
+    range_max_years: int = 100
+
+    # Date clustering settings
+    cluster_max_dates: int = 500000
+
     # OpenAI settings
     openai_api_key: str = "sk-your-key-here"
     openai_model: str = "gpt-3.5-turbo"
     openai_temperature: float = 0.7
     openai_max_tokens: int = 200
+    openai_base_url: Optional[str] = None  # e.g. an OpenAI-compatible proxy
+    openai_connect_timeout: float = 3.0
+    openai_read_timeout: float = 20.0
+    openai_max_connections: int = 20
+    openai_max_retries: int = 2
+    openai_backoff_base_seconds: float = 0.5
+    openai_backoff_max_seconds: float = 4.0
+
+    # AI path resilience
+    ai_latency_budget_seconds: float = 8.0
+    ai_breaker_failure_threshold: int = 5
+    ai_breaker_reset_seconds: float = 30.0
+
+    # AI output mode: "text" for prose sections, "json" for compact structured
+    # output; prompts are trimmed to the token budget by dropping dates
+    ai_output_mode: Literal["text", "json"] = "text"
+    ai_prompt_token_budget: int = 600
+    openai_json_max_tokens: int = 1200
+    # Output token limit of openai_model; batched requests are split to fit it
+    openai_max_output_tokens: int = 4096
+
+    # Micro-batching of concurrent AI prompts; a window of 0 disables it
+    ai_batch_window_seconds: float = 0.025
+    ai_batch_max_size: int = 8
+
+    # Deferred AI recommendation jobs
+    ai_job_workers: int = 4
+    ai_job_queue_size: int = 1000
+    ai_job_ttl_seconds: int = 600
+    ai_job_keepalive_seconds: float = 15.0
 
     class Config:
         env_prefix = "GOOD_DATES_"
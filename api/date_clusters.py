@@ -0,0 +1,57 @@
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+
+
+def cluster_dates(
+    dates: Sequence[str],
+    max_gap: int = 3,
+    min_size: int = 2,
+    power_levels: Optional[Sequence[float]] = None,
+    min_score: float = 0,
+) -> List[Dict[str, Any]]:
+    """Group ISO dates into clusters of nearby days.
+
+    Sorted dates at most ``max_gap`` days after the previous one share a
+    cluster, and clusters with fewer than ``min_size`` dates are dropped.
+    With ``power_levels`` (one per date) every cluster also gets a ``score``
+    summing its dates' levels, and clusters scoring below ``min_score`` are
+    dropped. Runs in linear time after one sort.
+    """
+    if power_levels is not None and len(power_levels) != len(dates):
+        raise ValueError("power_levels must have one entry per date")
+    if not dates or len(dates) < min_size:
+        return []
+
+    if power_levels is None:
+        ordered = sorted(dates)
+        levels: Optional[List[float]] = None
+    else:
+        order = sorted(range(len(dates)), key=dates.__getitem__)
+        ordered = [dates[i] for i in order]
+        levels = [power_levels[i] for i in order]
+
+    # Day ordinals turn every gap check into an integer subtraction
+    ordinals = [date.fromisoformat(value).toordinal() for value in ordered]
+
+    clusters = []
+    start = 0
+    count = len(ordered)
+    for end in range(1, count + 1):
+        if end < count and ordinals[end] - ordinals[end - 1] <= max_gap:
+            continue
+        if end - start >= min_size:
+            cluster: Dict[str, Any] = {
+                "start_date": ordered[start],
+                "end_date": ordered[end - 1],
+                "dates": ordered[start:end],
+                "duration": end - start,
+            }
+            if levels is not None:
+                cluster["score"] = sum(levels[start:end])
+                if cluster["score"] < min_score:
+                    start = end
+                    continue
+            clusters.append(cluster)
+        start = end
+
+    return clusters
@@ -0,0 +1,185 @@
+"""Sun sign ingress table for 1900-2100.
+
+The table lists the instant the Sun enters each zodiac sign, in minutes since
+1900-01-01 00:00, and is generated offline with::
+
+    python -m api.ephemeris
+
+Lookups memory-map the file and bisect it, so no astronomy runs per request.
+"""
+
+import math
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, List, Sequence, Tuple
+
+TABLE_PATH = Path(__file__).parent / "data" / "sun_ingress.bin"
+FIRST_YEAR = 1900
+LAST_YEAR = 2100
+
+# Signs in the order the Sun enters them each calendar year
+SIGN_ORDER = (
+    "Aquarius",
+    "Pisces",
+    "Aries",
+    "Taurus",
+    "Gemini",
+    "Cancer",
+    "Leo",
+    "Virgo",
+    "Libra",
+    "Scorpio",
+    "Sagittarius",
+    "Capricorn",
+)
+
+# Magic, format version, first year, number of years; then 12 uint32 per year
+_HEADER = struct.Struct("<4sHHH")
+_MAGIC = b"SUNI"
+_VERSION = 1
+
+_EPOCH_JD = 2415020.5  # 1900-01-01 00:00
+_EPOCH_ORDINAL = date(FIRST_YEAR, 1, 1).toordinal()
+_NOON = 720
+_DAY = 1440
+
+
+def solar_longitude(jd: float) -> float:
+    """Get the Sun's apparent ecliptic longitude in degrees for a Julian day.
+
+    Uses the low-precision solar theory from Meeus, Astronomical Algorithms
+    ch. 25, good to about 0.01 degrees (under 15 minutes of ingress time).
+    """
+    t = (jd - 2451545.0) / 36525
+    mean_longitude = 280.46646 + 36000.76983 * t + 0.0003032 * t * t
+    anomaly = math.radians(357.52911 + 35999.05029 * t - 0.0001537 * t * t)
+    center = (
+        (1.914602 - 0.004817 * t - 0.000014 * t * t) * math.sin(anomaly)
+        + (0.019993 - 0.000101 * t) * math.sin(2 * anomaly)
+        + 0.000289 * math.sin(3 * anomaly)
+    )
+    node = math.radians(125.04 - 1934.136 * t)
+    return (mean_longitude + center - 0.00569 - 0.00478 * math.sin(node)) % 360
+
+
+def find_ingress(longitude: float, jd: float) -> float:
+    """Get the Julian day the Sun reaches a longitude, starting from a guess."""
+    for _ in range(20):
+        error = (longitude - solar_longitude(jd) + 180) % 360 - 180
+        jd += error / 0.9856474  # Mean daily motion in degrees
+        if abs(error) < 1e-7:
+            break
+    return jd
+
+
+def build_ingress_table(
+    first_year: int = FIRST_YEAR, last_year: int = LAST_YEAR
+) -> bytes:
+    """Compute the ingress table file contents for a range of years.
+
+    Instants are in dynamical time, which is within a few minutes of UTC
+    over 1900-2100.
+    """
+    minutes = array("I")
+    jd = _EPOCH_JD + (date(first_year, 1, 20).toordinal() - _EPOCH_ORDINAL)
+    for _ in range(first_year, last_year + 1):
+        for sign in range(12):
+            jd = find_ingress((300 + 30 * sign) % 360, jd)
+            minutes.append(round((jd - _EPOCH_JD) * _DAY))
+            jd += 30.4
+    if sys.byteorder != "little":
+        minutes.byteswap()
+    header = _HEADER.pack(_MAGIC, _VERSION, first_year, last_year - first_year + 1)
+    return header + minutes.tobytes()
+
+
+@lru_cache(maxsize=None)
+def _ingress_minutes() -> Sequence[int]:
+    with open(TABLE_PATH, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, first_year, years = _HEADER.unpack_from(data)
+    if (magic, version, first_year) != (_MAGIC, _VERSION, FIRST_YEAR) or (
+        years != LAST_YEAR - FIRST_YEAR + 1
+    ):
+        raise ValueError(f"Unexpected sun ingress table in {TABLE_PATH}")
+
+    view = memoryview(data)[_HEADER.size :]
+    if sys.byteorder != "little":
+        swapped = array("I", view)
+        swapped.byteswap()
+        return swapped
+    return view.cast("I")
+
+
+@lru_cache(maxsize=None)
+def _sign_by_day() -> bytes:
+    """Index into SIGN_ORDER of the Sun's sign at noon, for every day in range."""
+    minutes = _ingress_minutes()
+    total = date(LAST_YEAR, 12, 31).toordinal() - _EPOCH_ORDINAL + 1
+    bounds = [0] + [_first_day(minute) for minute in minutes] + [total]
+    signs = [len(SIGN_ORDER) - 1] + [entry % 12 for entry in range(len(minutes))]
+    days = bytearray(total)
+    for sign, start, end in zip(signs, bounds[:-1], bounds[1:], strict=True):
+        days[start:end] = bytes([sign]) * (end - start)
+    return bytes(days)
+
+
+def _first_day(minute: int) -> int:
+    """Days since the epoch of the first day whose noon is at or after ``minute``."""
+    return -((_NOON - minute) // _DAY)
+
+
+def sun_sign_index(day: date) -> int:
+    """Get the index into SIGN_ORDER of the Sun's sign at noon UTC on a day.
+
+    Noon decides which sign a cusp day belongs to. The day must be within
+    FIRST_YEAR and LAST_YEAR.
+    """
+    minute = (day.toordinal() - _EPOCH_ORDINAL) * _DAY + _NOON
+    return (bisect_right(_ingress_minutes(), minute) - 1) % 12
+
+
+def sun_sign_indexes(days: Iterable[date]) -> List[int]:
+    """Get sun_sign_index for many days through a precomputed per-day table.
+
+    Days outside the table get -1.
+    """
+    by_day = _sign_by_day()
+    size = len(by_day)
+    return [
+        by_day[offset] if 0 <= offset < size else -1
+        for offset in (day.toordinal() - _EPOCH_ORDINAL for day in days)
+    ]
+
+
+def sign_periods(sign: str, year: int) -> List[Tuple[date, date]]:
+    """Get the first and last days of year with the Sun in a sign at noon.
+
+    Capricorn has two periods, at the start and end of the year.
+    """
+    minutes = _ingress_minutes()
+    entry = (year - FIRST_YEAR) * 12 + SIGN_ORDER.index(sign)
+    start = _first_day(minutes[entry])
+    if entry % 12 == 11:
+        aquarius = _first_day(minutes[entry - 11])
+        return [
+            (date(year, 1, 1), _to_date(aquarius - 1)),
+            (_to_date(start), date(year, 12, 31)),
+        ]
+    return [(_to_date(start), _to_date(_first_day(minutes[entry + 1]) - 1))]
+
+
+def _to_date(day: int) -> date:
+    return date.fromordinal(_EPOCH_ORDINAL + day)
+
+
+if __name__ == "__main__":
+    TABLE_PATH.parent.mkdir(exist_ok=True)
+    TABLE_PATH.write_bytes(build_ingress_table())
+    print(f"Wrote {TABLE_PATH}")
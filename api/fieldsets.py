@@ -0,0 +1,82 @@
+from typing import Any, Collection, Dict, List, Mapping, Optional, Tuple
+
+# A parsed fields= selector: each key maps to the selector for its value, and
+# an empty selector keeps the whole value
+FieldSpec = Dict[str, "FieldSpec"]
+
+
+def parse_fields(fields: str, allowed: Collection[str]) -> FieldSpec:
+    """Parse a comma-separated list of dotted field paths.
+
+    Raises ValueError if a top-level field is not in ``allowed``.
+    """
+    spec: FieldSpec = {}
+    for path in fields.split(","):
+        path = path.strip()
+        if not path:
+            continue
+        parts = path.split(".")
+        if parts[0] not in allowed:
+            raise ValueError(f"Unknown field {parts[0]!r}")
+
+        node = spec
+        for i, part in enumerate(parts):
+            if part in node and not node[part]:
+                break  # A parent path already selects the whole value
+            if i == len(parts) - 1:
+                node[part] = {}
+            else:
+                node = node.setdefault(part, {})
+    return spec
+
+
+def select_fields(data: Any, spec: FieldSpec) -> Any:
+    """Keep only the parts of nested mappings named by a field selector."""
+    if not spec or not isinstance(data, Mapping):
+        return data
+    return {
+        key: select_fields(data[key], child)
+        for key, child in spec.items()
+        if key in data
+    }
+
+
+def paginate_dates(
+    dates: List[str], month: Optional[int], offset: int, limit: Optional[int]
+) -> Tuple[List[str], int, Optional[int]]:
+    """Get one page of dates, the number of dates in the month, and the next offset."""
+    if month is not None:
+        prefix = f"-{month:02}-"
+        dates = [date for date in dates if date[4:8] == prefix]
+    end = len(dates) if limit is None else offset + limit
+    next_offset = end if end < len(dates) else None
+    return dates[offset:end], len(dates), next_offset
+
+
+def slice_zodiac_info(
+    zodiac_info: Mapping[str, Any], page: List[str]
+) -> Mapping[str, Any]:
+    """Restrict cached zodiac information to the recommendations for a page of dates.
+
+    The cached value is not modified; only the per-date parts are rebuilt.
+    """
+    recommendations = zodiac_info.get("recommendations")
+    if not isinstance(recommendations, Mapping):
+        return zodiac_info
+
+    first, last = (page[0], page[-1]) if page else ("", "")
+    advice = recommendations.get("date_specific_advice") or {}
+    return {
+        **zodiac_info,
+        "recommendations": {
+            **recommendations,
+            "date_specific_advice": {
+                date: advice[date] for date in page if date in advice
+            },
+            "power_periods": [
+                period
+                for period in recommendations.get("power_periods") or []
+                if page and period["start_date"] <= last and period["end_date"] >= first
+            ],
+        },
+    }
@@ -1,45 +1,170 @@
-from typing import List, Tuple, Dict, Any
-import calendar
+from typing import Any, ChainMap, Dict, Iterator, List, Mapping, Optional, Tuple
+from array import array
+from datetime import date, timedelta
+from functools import lru_cache
 from api.numerology import (
-    get_date_compatibility,
     get_number_meaning,
     calculate_life_path_number,
 )
-from api.zodiac import get_zodiac_sign
+from api.numerology_kernel import date_number
+from api.zodiac import get_sign_periods, get_zodiac_sign
 from api.ai_recommendations import get_personalized_recommendations
 
 
+class YearIndex:
+    """Days of a year grouped by their numerology number.
+
+    Day-of-year positions are stored contiguously in ``days``, bucketed by
+    number, so ``days[offsets[n]:offsets[n + 1]]`` holds every day whose
+    number is ``n``. ``labels`` maps a position back to its ISO date string.
+    """
+
+    __slots__ = ("year", "single_digit", "labels", "days", "offsets")
+
+    def __init__(self, year: int, single_digit: bool = True):
+        self.year = year
+        self.single_digit = single_digit
+
+        first_day = date(year, 1, 1)
+        day_count = (date(year + 1, 1, 1) - first_day).days
+        days = [first_day + timedelta(days=i) for i in range(day_count)]
+        self.labels: Tuple[str, ...] = tuple(day.isoformat() for day in days)
+        numbers = [
+            date_number(day.year, day.month, day.day, single_digit) for day in days
+        ]
+
+        # Counting sort: bucket sizes become offsets, then fill each bucket
+        counts = [0] * (max(numbers) + 2)
+        for number in numbers:
+            counts[number + 1] += 1
+        for n in range(1, len(counts)):
+            counts[n] += counts[n - 1]
+        self.offsets = array("H", counts)
+
+        self.days = array("H", [0]) * day_count
+        cursor = list(counts)
+        for position, number in enumerate(numbers):
+            self.days[cursor[number]] = position
+            cursor[number] += 1
+
+    def lookup(self, number: int) -> List[str]:
+        """Return the dates of this year whose number equals ``number``."""
+        if number < 0 or number + 1 >= len(self.offsets):
+            return []
+        start, end = self.offsets[number], self.offsets[number + 1]
+        return [self.labels[position] for position in self.days[start:end]]
+
+
+@lru_cache(maxsize=128)
+def get_year_index(year: int, single_digit: bool = True) -> YearIndex:
+    """Get the (shared) numerology index for a year and reduction mode."""
+    return YearIndex(year, single_digit)
+
+
 def calculate_numerology_dates(
     birth_date: str,
     year: int,
     match_on_single_digit: bool = True,
 ) -> Tuple[List[str], int, str]:
     """Calculate good dates based on numerology."""
-    # Get initial numerology number for birth date
+    # Birth date is reduced once; matching days come straight from the index
+    birth_number = calculate_life_path_number(birth_date, match_on_single_digit)
+    return calculate_dates_for_number(birth_number, year, match_on_single_digit)
+
+
+def calculate_dates_for_number(
+    number: int,
+    year: int,
+    match_on_single_digit: bool = True,
+) -> Tuple[List[str], int, str]:
+    """Calculate good dates for an already reduced life path number."""
+    dates = get_year_index(int(year), match_on_single_digit).lookup(number)
+    return dates, number, get_number_meaning(number)
+
+
+def iter_numerology_dates(
+    birth_date: str,
+    start: date,
+    end: date,
+    match_on_single_digit: bool = True,
+    by_month: bool = False,
+) -> Iterator[Tuple[int, Optional[int], List[str]]]:
+    """Yield (year, month, dates) chunks of good dates between start and end.
+
+    One chunk is produced per year, or per month when ``by_month`` is set
+    (``month`` is None for yearly chunks), so only a single chunk is held in
+    memory at a time however wide the range is.
+    """
     birth_number = calculate_life_path_number(birth_date, match_on_single_digit)
+    first, last = start.isoformat(), end.isoformat()
+
+    for year in range(start.year, end.year + 1):
+        dates = get_year_index(year, match_on_single_digit).lookup(birth_number)
+        if year in (start.year, end.year):
+            dates = [d for d in dates if first <= d <= last]
+
+        if not by_month:
+            yield year, None, dates
+            continue
 
-    dates = []
-    for month in range(1, 13):
-        for day in range(1, calendar.monthrange(int(year), month)[1] + 1):
-            date = f"{year}-{month:02}-{day:02}"
-            is_compatible, _, _ = get_date_compatibility(
-                birth_date=birth_date,
-                target_date=date,
-                single_digit=match_on_single_digit,
-            )
-            if is_compatible:
-                dates.append(date)
+        first_month = start.month if year == start.year else 1
+        last_month = end.month if year == end.year else 12
+        by_month_dates: Dict[int, List[str]] = {}
+        for d in dates:
+            by_month_dates.setdefault(int(d[5:7]), []).append(d)
+        for month in range(first_month, last_month + 1):
+            yield year, month, by_month_dates.get(month, [])
 
-    meaning = get_number_meaning(birth_number)
-    return dates, birth_number, meaning
+
+@lru_cache(maxsize=512)
+def _sign_season(sign: str, year: int) -> Tuple[str, ...]:
+    return tuple(
+        date.fromordinal(day).isoformat()
+        for first, last in get_sign_periods(sign, year)
+        for day in range(first.toordinal(), last.toordinal() + 1)
+    )
 
 
 def calculate_zodiac_favorable_dates(
-    zodiac_info: Dict[str, Any], year: int
+    zodiac_info: Mapping[str, Any], year: int
 ) -> List[str]:
-    """Calculate favorable dates based on zodiac sign."""
-    # This is a placeholder - we'll implement actual zodiac calculations later
-    return []
+    """Calculate favorable dates based on zodiac sign.
+
+    These are the days of the year the Sun spends in the sign, read from the
+    precomputed ingress table.
+    """
+    return list(_sign_season(zodiac_info["name"], year))
+
+
+def get_zodiac_details(birth_date: str, year: int) -> ChainMap[str, Any]:
+    """Get zodiac sign information and favorable dates, without recommendations.
+
+    The per-request fields are an overlay on the shared sign record.
+    """
+    sign = get_zodiac_sign(birth_date)
+    favorable_dates = calculate_zodiac_favorable_dates(sign, year)
+    overlay = {"favorable_dates": favorable_dates}
+    # ChainMap only writes to its first map, so the shared record stays read-only
+    return ChainMap(overlay, sign)  # type: ignore[arg-type]
+
+
+async def calculate_zodiac_info(
+    birth_date: str,
+    year: int,
+    numerology_number: int,
+    dates: List[str],
+) -> ChainMap[str, Any]:
+    """Calculate zodiac sign information and AI recommendations for a birth date."""
+    zodiac_info = get_zodiac_details(birth_date, year)
+
+    # Get AI-powered recommendations
+    recommendations = await get_personalized_recommendations(
+        numerology_number=numerology_number,
+        zodiac_sign=zodiac_info["name"],
+        dates=dates,
+    )
+    zodiac_info["recommendations"] = recommendations
+    return zodiac_info
 
 
 async def good_dates(
@@ -47,7 +172,7 @@ async def good_dates(
     year: int,
     match_on_single_digit: bool = True,
     include_zodiac: bool = False,
-) -> Tuple[List[str], int, str, Dict[str, Any]]:
+) -> Tuple[List[str], int, str, Optional[Mapping[str, Any]]]:
     """Calculate good dates based on numerology and zodiac sign."""
     dates, numerology_number, meaning = calculate_numerology_dates(
         birth_date, year, match_on_single_digit
@@ -55,17 +180,8 @@ async def good_dates(
 
     zodiac_info = None
     if include_zodiac:
-        zodiac_info = get_zodiac_sign(birth_date)
-        zodiac_info["favorable_dates"] = calculate_zodiac_favorable_dates(
-            zodiac_info, year
-        )
-
-        # Get AI-powered recommendations
-        recommendations = await get_personalized_recommendations(
-            numerology_number=numerology_number,
-            zodiac_sign=zodiac_info["name"],
-            dates=dates,
+        zodiac_info = await calculate_zodiac_info(
+            birth_date, year, numerology_number, dates
         )
-        zodiac_info["recommendations"] = recommendations
 
     return dates, numerology_number, meaning, zodiac_info
@@ -1,10 +1,61 @@
+import asyncio
+import json
 from datetime import datetime
 
-from fastapi import FastAPI, HTTPException, Depends
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from fastapi import FastAPI, HTTPException, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
 
-from api.model import GoodDateRequest, GoodDateResponse
-from api.cache import get_cached_good_dates, clear_expired_cache
+from api.model import (
+    GoodDateRequest,
+    GoodDateResponse,
+    GoodDateBatchRequest,
+    GoodDateBatchResult,
+    GoodDateBatchResponse,
+    GoodDateRangeRequest,
+    GoodDateRangeChunk,
+    RecommendationJobResponse,
+    DateCluster,
+    DateClusterRequest,
+    DateClusterResponse,
+    to_json_compatible,
+)
+from api.date_clusters import cluster_dates
+from api.fieldsets import (
+    paginate_dates,
+    parse_fields,
+    select_fields,
+    slice_zodiac_info,
+)
+from api.good_dates import get_zodiac_details, iter_numerology_dates
+from api.openai_client import create_openai_client, close_openai_client
+from api.ai_recommendations import get_ai_stats, stream_personalized_recommendations
+from api.numerology import calculate_life_path_number, get_number_meaning
+from api.cache import (
+    GoodDatesQuery,
+    get_cached_good_dates,
+    get_cached_good_dates_batch,
+    get_cache_stats,
+    clear_expired_cache,
+    start_cache_sweeper,
+    stop_cache_sweeper,
+    start_cache_snapshots,
+    stop_cache_snapshots,
+    start_cache_prewarm,
+    is_cache_ready,
+    peek_cached_zodiac_info,
+)
+from api.recommendation_jobs import (
+    JobQueueFull,
+    get_recommendation_job,
+    get_recommendation_job_stats,
+    start_recommendation_workers,
+    stop_recommendation_workers,
+    submit_recommendation_job,
+)
 from api.limiter import check_rate_limit
 from api.logger import setup_logging, logger
 from api.auth import verify_api_key
@@ -42,6 +93,53 @@ app.add_middleware(
 )
 
 
+def sse_event(name: str, data: str) -> str:
+    """Format a Server-Sent Event with a single-line JSON payload."""
+    return f"event: {name}\ndata: {data}\n\n"
+
+
+def event_stream_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """Wrap Server-Sent Events in an uncached streaming response."""
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.on_event("startup")
+async def start_cache_maintenance() -> None:
+    start_cache_sweeper()
+    start_cache_snapshots()
+    start_cache_prewarm()
+
+
+@app.on_event("shutdown")
+async def stop_cache_maintenance() -> None:
+    await stop_cache_sweeper()
+    await stop_cache_snapshots()
+
+
+@app.on_event("startup")
+async def start_openai_client() -> None:
+    create_openai_client()
+
+
+@app.on_event("shutdown")
+async def stop_openai_client() -> None:
+    await close_openai_client()
+
+
+@app.on_event("startup")
+async def start_recommendation_jobs() -> None:
+    start_recommendation_workers()
+
+
+@app.on_event("shutdown")
+async def stop_recommendation_jobs() -> None:
+    await stop_recommendation_workers()
+
+
 @app.get("/")
 def read_root():
     return {
@@ -51,41 +149,357 @@ def read_root():
     }
 
 
+@app.get("/ready")
+def readiness() -> JSONResponse:
+    """Report whether startup cache prewarming has finished."""
+    if is_cache_ready():
+        return JSONResponse({"status": "ready"})
+    return JSONResponse({"status": "warming"}, status_code=503)
+
+
 @app.post("/good-dates/", response_model=GoodDateResponse)
 async def get_good_dates(
     request: GoodDateRequest,
     _rate_limit: None = Depends(check_rate_limit),
-) -> GoodDateResponse:
-    """Get good dates based on numerology and zodiac sign."""
+    fields: Optional[str] = Query(
+        None,
+        description=(
+            "Comma-separated response fields to return, with dots for nested "
+            "zodiac fields, e.g. dates,zodiac_sign.recommendations.career"
+        ),
+    ),
+    month: Optional[int] = Query(
+        None, ge=1, le=12, description="Only return dates in this month"
+    ),
+    offset: int = Query(0, ge=0, description="Index of the first date to return"),
+    limit: Optional[int] = Query(
+        None, ge=1, description="Largest number of dates to return"
+    ),
+) -> Any:
+    """Get good dates based on numerology and zodiac sign.
+
+    The full result is cached; ``fields``, ``month``, ``offset`` and
+    ``limit`` only select which parts of it are returned.
+    """
+    try:
+        spec = parse_fields(fields, GoodDateResponse.model_fields) if fields else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    # Skip the zodiac work entirely when it is not selected
+    include_zodiac = request.include_zodiac and (spec is None or "zodiac_sign" in spec)
+
     try:
         logger.info(
             f"Calculating good dates for birth_date={request.birth_date}, year={request.year}"
         )
 
-        dates, numerology_number, number_meaning, zodiac_info = (
-            await get_cached_good_dates(
-                birth_date=request.birth_date,
-                year=request.year or datetime.now().year,
-                match_on_single_digit=request.match_on_single_digit,
-                include_zodiac=request.include_zodiac,
-            )
+        year = request.year or datetime.now().year
+        defer = include_zodiac and request.defer_recommendations
+        (
+            dates,
+            numerology_number,
+            number_meaning,
+            zodiac_info,
+        ) = await get_cached_good_dates(
+            birth_date=request.birth_date,
+            year=year,
+            match_on_single_digit=request.match_on_single_digit,
+            include_zodiac=include_zodiac and not defer,
         )
 
+        # Serve cached recommendations inline, otherwise hand them to a job
+        job_id = None
+        if defer:
+            zodiac_info = await peek_cached_zodiac_info(
+                request.birth_date, year, request.match_on_single_digit
+            )
+            if zodiac_info is None:
+                job = submit_recommendation_job(
+                    request.birth_date,
+                    year,
+                    request.match_on_single_digit,
+                    numerology_number,
+                    dates,
+                )
+                job_id = job.job_id
+                zodiac_info = get_zodiac_details(request.birth_date, year)
+
+        total_matches = len(dates)
+        next_offset = None
+        if month is not None or offset or limit is not None:
+            dates, total_matches, next_offset = paginate_dates(
+                dates, month, offset, limit
+            )
+            if zodiac_info is not None:
+                zodiac_info = slice_zodiac_info(zodiac_info, dates)
+
+        if spec is not None:
+            # Build only the selected fields and skip response model validation
+            data = {
+                "dates": dates,
+                "numerology_number": numerology_number,
+                "number_meaning": number_meaning,
+                "total_matches": total_matches,
+                "zodiac_sign": (
+                    dict(zodiac_info) if include_zodiac and zodiac_info else None
+                ),
+                "recommendation_job_id": job_id,
+                "next_offset": next_offset,
+            }
+            return JSONResponse(to_json_compatible(select_fields(data, spec)))
+
         return GoodDateResponse(
             dates=dates,
             numerology_number=numerology_number,
             number_meaning=number_meaning,
-            total_matches=len(dates),
-            zodiac_sign=zodiac_info if request.include_zodiac else None,
+            total_matches=total_matches,
+            zodiac_sign=zodiac_info if include_zodiac else None,
+            recommendation_job_id=job_id,
+            next_offset=next_offset,
         )
 
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
     except Exception as e:
         logger.error(f"Error processing request: {str(e)}")
         raise HTTPException(
             status_code=400,
             detail=str(e),
+        ) from e
+
+
+@app.get(
+    "/good-dates/jobs/{job_id}",
+    response_model=RecommendationJobResponse,
+)
+async def get_recommendation_job_status(
+    job_id: str,
+    _rate_limit: None = Depends(check_rate_limit),
+) -> RecommendationJobResponse:
+    """Poll a deferred zodiac recommendation job."""
+    job = get_recommendation_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Recommendation job not found")
+    return RecommendationJobResponse(**job.to_dict())
+
+
+@app.get(
+    "/good-dates/jobs/{job_id}/events",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def stream_recommendation_job(
+    job_id: str,
+    _rate_limit: None = Depends(check_rate_limit),
+) -> StreamingResponse:
+    """Stream a deferred recommendation job as Server-Sent Events.
+
+    A ``status`` event is sent straight away and a ``result`` event once the
+    job finishes, with keepalive comments in between.
+    """
+    job = get_recommendation_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Recommendation job not found")
+
+    def job_event(name: str) -> str:
+        return sse_event(
+            name, RecommendationJobResponse(**job.to_dict()).model_dump_json()
         )
 
+    async def events() -> AsyncIterator[str]:
+        yield job_event("status")
+        while not job.finished.is_set():
+            try:
+                await asyncio.wait_for(
+                    job.finished.wait(), timeout=settings.ai_job_keepalive_seconds
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+        yield job_event("result")
+
+    return event_stream_response(events())
+
+
+@app.post(
+    "/good-dates/recommendations/stream",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def stream_recommendations(
+    request: GoodDateRequest,
+    _rate_limit: None = Depends(check_rate_limit),
+) -> StreamingResponse:
+    """Stream good dates and AI recommendations as Server-Sent Events.
+
+    Sends a ``profile`` event with the dates and zodiac sign straight away,
+    then ``token`` events as the completion is generated and a ``section``
+    event for each finished category block. The final ``result`` event has
+    the same shape as the /good-dates/ response with zodiac information.
+    """
+    year = request.year or datetime.now().year
+    logger.info(
+        f"Streaming recommendations for birth_date={request.birth_date}, year={year}"
+    )
+    # Fail before the stream starts, while a status code can still be sent
+    try:
+        dates, numerology_number, number_meaning, _ = await get_cached_good_dates(
+            birth_date=request.birth_date,
+            year=year,
+            match_on_single_digit=request.match_on_single_digit,
+        )
+        zodiac_info = get_zodiac_details(request.birth_date, year)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    response = GoodDateResponse(
+        dates=dates,
+        numerology_number=numerology_number,
+        number_meaning=number_meaning,
+        total_matches=len(dates),
+        zodiac_sign=zodiac_info,
+    )
+
+    async def events() -> AsyncIterator[str]:
+        yield sse_event("profile", response.model_dump_json())
+        async for name, data in stream_personalized_recommendations(
+            numerology_number, zodiac_info["name"], dates
+        ):
+            if name == "result":
+                result = response.model_copy(
+                    update={"zodiac_sign": {**zodiac_info, "recommendations": data}}
+                )
+                yield sse_event(name, result.model_dump_json())
+            elif name == "token":
+                yield sse_event(name, json.dumps({"text": data}))
+            else:
+                yield sse_event(name, json.dumps(data))
+
+    return event_stream_response(events())
+
+
+@app.post(
+    "/good-dates/range",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def get_good_dates_range(
+    request: GoodDateRangeRequest,
+    _rate_limit: None = Depends(check_rate_limit),
+) -> StreamingResponse:
+    """Stream good dates over a multi-year range as NDJSON, one line per chunk."""
+    if request.start_date is None or request.end_date is None:
+        # Only reachable for requests built without validation
+        raise HTTPException(
+            status_code=400,
+            detail="year_start/year_end or start_date/end_date is required",
+        )
+    logger.info(
+        f"Streaming good dates for birth_date={request.birth_date}, "
+        f"range={request.start_date}..{request.end_date}"
+    )
+
+    numerology_number = calculate_life_path_number(
+        request.birth_date, request.match_on_single_digit
+    )
+    number_meaning = get_number_meaning(numerology_number)
+    chunks = iter_numerology_dates(
+        birth_date=request.birth_date,
+        start=request.start_date,
+        end=request.end_date,
+        match_on_single_digit=request.match_on_single_digit,
+        by_month=request.granularity == "month",
+    )
+
+    def lines() -> Iterator[str]:
+        for year, month, dates in chunks:
+            chunk = GoodDateRangeChunk(
+                year=year,
+                month=month,
+                dates=dates,
+                numerology_number=numerology_number,
+                number_meaning=number_meaning,
+                total_matches=len(dates),
+            )
+            yield chunk.model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.post("/good-dates/batch", response_model=GoodDateBatchResponse)
+async def get_good_dates_batch(
+    request: GoodDateBatchRequest,
+    _rate_limit: None = Depends(check_rate_limit),
+) -> GoodDateBatchResponse:
+    """Get good dates for many birth dates in a single request."""
+    logger.info(f"Calculating good dates batch of {len(request.items)} items")
+
+    current_year = datetime.now().year
+    errors: Dict[int, str] = {}
+    items: List[Optional[GoodDateRequest]] = []
+    for index, raw_item in enumerate(request.items):
+        try:
+            items.append(GoodDateRequest(**raw_item))
+        except ValidationError as e:
+            errors[index] = str(e)
+            items.append(None)
+
+    valid = [(index, item) for index, item in enumerate(items) if item is not None]
+    queries: List[GoodDatesQuery] = [
+        (
+            item.birth_date,
+            item.year or current_year,
+            item.match_on_single_digit,
+            item.include_zodiac,
+        )
+        for _, item in valid
+    ]
+    outcomes = await get_cached_good_dates_batch(queries)
+
+    results = [GoodDateBatchResult(index=index) for index in range(len(items))]
+    for index, message in errors.items():
+        results[index].error = message
+    for (index, item), outcome in zip(valid, outcomes, strict=True):
+        if isinstance(outcome, Exception):
+            logger.error(f"Error processing batch item {index}: {str(outcome)}")
+            results[index].error = str(outcome)
+            continue
+        dates, numerology_number, number_meaning, zodiac_info = outcome
+        results[index].result = GoodDateResponse(
+            dates=dates,
+            numerology_number=numerology_number,
+            number_meaning=number_meaning,
+            total_matches=len(dates),
+            zodiac_sign=zodiac_info if item.include_zodiac else None,
+        )
+
+    return GoodDateBatchResponse(
+        results=results,
+        total_errors=sum(1 for result in results if result.error is not None),
+    )
+
+
+@app.post("/date-clusters", response_model=DateClusterResponse)
+async def get_date_clusters(
+    request: DateClusterRequest,
+    _rate_limit: None = Depends(check_rate_limit),
+) -> DateClusterResponse:
+    """Group client-supplied dates into clusters of nearby days."""
+    logger.info(f"Clustering {len(request.dates)} dates")
+    try:
+        clusters = cluster_dates(
+            request.dates,
+            max_gap=request.max_gap,
+            min_size=request.min_size,
+            power_levels=request.power_levels,
+            min_score=request.min_score,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    return DateClusterResponse(
+        clusters=[DateCluster(**cluster) for cluster in clusters],
+        total_clusters=len(clusters),
+    )
+
 
 @app.post("/cache/clear")
 async def clear_cache(
@@ -93,5 +507,21 @@ async def clear_cache(
 ):
     """Clear the calculation cache."""
     logger.info("Clearing calculation cache")
-    clear_expired_cache()
+    await clear_expired_cache()
     return {"message": "Cache cleared successfully"}
+
+
+@app.get("/cache/stats")
+async def cache_stats(
+    _rate_limit: None = Depends(check_rate_limit), _auth: str = Depends(verify_api_key)
+) -> Dict[str, Dict[str, Any]]:
+    """Get size, hit rate and eviction counters for each cache layer."""
+    return await get_cache_stats()
+
+
+@app.get("/ai/stats")
+async def ai_stats(
+    _rate_limit: None = Depends(check_rate_limit), _auth: str = Depends(verify_api_key)
+) -> Dict[str, Any]:
+    """Get AI request, fallback, circuit breaker and job queue counters."""
+    return {**get_ai_stats(), "jobs": get_recommendation_job_stats()}
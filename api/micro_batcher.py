@@ -0,0 +1,130 @@
+import asyncio
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+R = TypeVar("R")
+V = TypeVar("V")
+
+
+class MicroBatcher(Generic[R, V]):
+    """Gather concurrent requests over a short window into batched calls.
+
+    Requests submitted within ``window`` seconds of the first pending one are
+    collected. Requests with the same key share a single result, and the
+    distinct ones are passed to ``run_batch`` in groups of at most
+    ``max_size`` that share a ``group`` key. ``run_batch`` must return one
+    value per request, in order; if it raises, every waiter in that batch
+    gets the exception.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[R]], Awaitable[List[V]]],
+        window: float,
+        max_size: int,
+        group: Callable[[R], Hashable] = lambda request: None,
+    ):
+        self.run_batch = run_batch
+        self.window = window
+        self.max_size = max_size
+        self.group = group
+        self.requests = 0
+        self.deduplicated = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Unresolved results by request key, shared by duplicate submissions
+        self._futures: Dict[Hashable, "asyncio.Future[V]"] = {}
+        # Requests waiting for the window to close, by group
+        self._pending: Dict[Hashable, List[Tuple[Hashable, R]]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    async def submit(self, key: Hashable, request: R) -> V:
+        """Queue a request and wait for its share of the batched result."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._reset(loop)
+        self.requests += 1
+
+        future = self._futures.get(key)
+        if future is not None:
+            self.deduplicated += 1
+        else:
+            future = loop.create_future()
+            self._futures[key] = future
+            group = self._pending.setdefault(self.group(request), [])
+            group.append((key, request))
+            if len(group) >= self.max_size:
+                self._start_batch(self._pending.pop(self.group(request)))
+            elif self._timer is None:
+                self._timer = loop.call_later(self.window, self._flush)
+
+        # Shielded so a waiter giving up does not cancel the shared result
+        return await asyncio.shield(future)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get request, deduplication and batch counters."""
+        return {
+            "requests": self.requests,
+            "deduplicated": self.deduplicated,
+            "batches": self.batches,
+            "batched_requests": self.batched_requests,
+            "average_batch_size": (
+                self.batched_requests / self.batches if self.batches else 0.0
+            ),
+        }
+
+    def _reset(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Drop state belonging to a previous event loop."""
+        self._loop = loop
+        self._futures = {}
+        self._pending = {}
+        self._timer = None
+        self._tasks = set()
+
+    def _flush(self) -> None:
+        self._timer = None
+        pending, self._pending = self._pending, {}
+        for items in pending.values():
+            self._start_batch(items)
+
+    def _start_batch(self, items: List[Tuple[Hashable, R]]) -> None:
+        assert self._loop is not None
+        task = self._loop.create_task(self._run(items))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, items: List[Tuple[Hashable, R]]) -> None:
+        self.batches += 1
+        self.batched_requests += len(items)
+        futures = [self._futures[key] for key, _ in items]
+        try:
+            values = await self.run_batch([request for _, request in items])
+            if len(values) != len(items):
+                raise ValueError(
+                    f"Batch returned {len(values)} results for {len(items)} requests"
+                )
+        except Exception as e:  # pylint: disable=broad-except
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for future, value in zip(futures, values, strict=True):
+                if not future.done():
+                    future.set_result(value)
+        finally:
+            # Requests arriving from now on start a new batch
+            for key, _ in items:
+                self._futures.pop(key, None)
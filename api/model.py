@@ -1,9 +1,27 @@
+import re
 from datetime import date
-from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field, validator
+from typing import Annotated, Optional, List, Dict, Any, Literal, Mapping
+from pydantic import BaseModel, Field, PlainSerializer, validator, root_validator
+from api.config import settings
 from api.docs import GOOD_DATES_EXAMPLE
 
 
+def to_json_compatible(value: Any) -> Any:
+    """Copy read-only mappings and tuples into the dicts and lists JSON needs.
+
+    Cached zodiac payloads share read-only parts between requests, so they
+    are only converted when a response is serialized.
+    """
+    if isinstance(value, Mapping):
+        return {key: to_json_compatible(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json_compatible(item) for item in value]
+    return value
+
+
+ZodiacPayload = Annotated[Mapping[str, Any], PlainSerializer(to_json_compatible)]
+
+
 class GoodDateRequest(BaseModel):
     birth_date: str = Field(
         ...,
@@ -16,12 +34,21 @@ class GoodDateRequest(BaseModel):
     )
     year: Optional[int] = Field(
         None,
+        ge=1,
+        le=9998,
         description="Year to calculate dates for (defaults to current year)",
     )
     include_zodiac: bool = Field(
         False,
         description="Whether to include zodiac sign information",
     )
+    defer_recommendations: bool = Field(
+        False,
+        description=(
+            "Return dates immediately and compute zodiac recommendations in the "
+            "background, to be fetched with the returned job id"
+        ),
+    )
 
     @validator("birth_date")
     def validate_birth_date(cls, v):
@@ -60,13 +87,281 @@ class GoodDateResponse(BaseModel):
     )
     total_matches: int = Field(
         ...,
-        description="Total number of matching dates found",
+        description=(
+            "Total number of matching dates found, within the month if one "
+            "was requested"
+        ),
         example=36,
     )
-    zodiac_sign: Optional[Dict[str, Any]] = Field(
+    zodiac_sign: Optional[ZodiacPayload] = Field(
         None,
         description="Zodiac sign information and recommendations",
     )
+    recommendation_job_id: Optional[str] = Field(
+        None,
+        description="Job computing deferred zodiac recommendations, if any",
+    )
+    next_offset: Optional[int] = Field(
+        None,
+        description="Offset of the next page of dates, if more remain",
+    )
 
     class Config:
         json_schema_extra = {"example": GOOD_DATES_EXAMPLE}
+
+
+class RecommendationJobResponse(BaseModel):
+    job_id: str = Field(..., description="Recommendation job id")
+    status: Literal["pending", "running", "done", "failed"] = Field(
+        ...,
+        description="Job status",
+        example="done",
+    )
+    zodiac_sign: Optional[ZodiacPayload] = Field(
+        None,
+        description="Zodiac sign information and recommendations, once done",
+    )
+    error: Optional[str] = Field(
+        None,
+        description="Error message if the job failed",
+    )
+
+
+class GoodDateRangeRequest(BaseModel):
+    birth_date: str = Field(
+        ...,
+        description="Birth date in YYYY-MM-DD format",
+        example="1990-01-01",
+    )
+    match_on_single_digit: bool = Field(
+        True,
+        description="Whether to match on single digit numerology",
+    )
+    year_start: Optional[int] = Field(
+        None,
+        description="First year of the range (use with year_end)",
+    )
+    year_end: Optional[int] = Field(
+        None,
+        description="Last year of the range, inclusive (use with year_start)",
+    )
+    start_date: Optional[date] = Field(
+        None,
+        description="First date of the range (use with end_date)",
+    )
+    end_date: Optional[date] = Field(
+        None,
+        description="Last date of the range, inclusive (use with start_date)",
+    )
+    granularity: Literal["year", "month"] = Field(
+        "year",
+        description="Whether to stream one line per year or per month",
+    )
+
+    @validator("birth_date")
+    def validate_birth_date(cls, v):
+        try:
+            date.fromisoformat(v)
+            return v
+        except ValueError:
+            raise ValueError("birth_date must be in YYYY-MM-DD format")
+
+    @root_validator(skip_on_failure=True)
+    def validate_range(cls, values):
+        year_start, year_end = values.get("year_start"), values.get("year_end")
+        start_date, end_date = values.get("start_date"), values.get("end_date")
+
+        if year_start is not None and year_end is not None:
+            if start_date is not None or end_date is not None:
+                raise ValueError("use either year_start/year_end or dates, not both")
+            if not 1 <= year_start <= 9998 or not 1 <= year_end <= 9998:
+                raise ValueError("years must be between 1 and 9998")
+            start_date, end_date = date(year_start, 1, 1), date(year_end, 12, 31)
+        elif start_date is None or end_date is None:
+            raise ValueError("year_start/year_end or start_date/end_date is required")
+        elif end_date.year > 9998:
+            raise ValueError("end_date must be before 9999-01-01")
+
+        if start_date > end_date:
+            raise ValueError("range start must not be after range end")
+        if end_date.year - start_date.year >= settings.range_max_years:
+            raise ValueError(f"range may span at most {settings.range_max_years} years")
+
+        values["start_date"], values["end_date"] = start_date, end_date
+        return values
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "birth_date": "1990-01-01",
+                "match_on_single_digit": True,
+                "year_start": 2024,
+                "year_end": 2050,
+                "granularity": "year",
+            }
+        }
+
+
+class GoodDateRangeChunk(BaseModel):
+    year: int = Field(..., description="Year of this chunk", example=2024)
+    month: Optional[int] = Field(
+        None,
+        description="Month of this chunk, for monthly granularity",
+    )
+    dates: List[str] = Field(
+        ...,
+        description="Good dates within this chunk",
+        example=["2024-01-01", "2024-01-10"],
+    )
+    numerology_number: int = Field(
+        ...,
+        description="Your numerology number",
+        example=7,
+    )
+    number_meaning: str = Field(
+        ...,
+        description="The meaning of your numerology number",
+        example="Analysis, spirituality, and wisdom",
+    )
+    total_matches: int = Field(
+        ...,
+        description="Number of matching dates in this chunk",
+        example=4,
+    )
+
+
+class GoodDateBatchRequest(BaseModel):
+    items: List[Dict[str, Any]] = Field(
+        ...,
+        description=(
+            "Good dates requests, each shaped like a single /good-dates/ request. "
+            "Items are validated individually."
+        ),
+    )
+
+    @validator("items")
+    def validate_items(cls, v):
+        if len(v) > settings.batch_max_items:
+            raise ValueError(
+                f"batch may contain at most {settings.batch_max_items} items"
+            )
+        return v
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "items": [
+                    {"birth_date": "1990-01-01", "year": 2024},
+                    {"birth_date": "1985-06-15", "match_on_single_digit": False},
+                ]
+            }
+        }
+
+
+class GoodDateBatchResult(BaseModel):
+    index: int = Field(
+        ...,
+        description="Position of the item in the request",
+        example=0,
+    )
+    result: Optional[GoodDateResponse] = Field(
+        None,
+        description="Good dates for the item, if it succeeded",
+    )
+    error: Optional[str] = Field(
+        None,
+        description="Why the item failed, if it did",
+    )
+
+
+class GoodDateBatchResponse(BaseModel):
+    results: List[GoodDateBatchResult] = Field(
+        ...,
+        description="One result per request item, in input order",
+    )
+    total_errors: int = Field(
+        ...,
+        description="Number of items that failed",
+        example=0,
+    )
+
+
+# Zero-padded YYYY-MM-DD, the only form the clustering engine sorts correctly
+ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+class DateClusterRequest(BaseModel):
+    dates: List[str] = Field(
+        ...,
+        description="Dates to cluster, in YYYY-MM-DD format",
+        example=["2024-01-03", "2024-01-05", "2024-01-20"],
+    )
+    power_levels: Optional[List[float]] = Field(
+        None,
+        description="Optional weight per date, summed into each cluster's score",
+    )
+    max_gap: int = Field(
+        3,
+        ge=0,
+        description="Largest gap in days between neighbouring dates of a cluster",
+    )
+    min_size: int = Field(
+        2,
+        ge=1,
+        description="Smallest number of dates in a returned cluster",
+    )
+    min_score: float = Field(
+        0,
+        description="Smallest score of a returned cluster, with power_levels",
+    )
+
+    @validator("dates")
+    def validate_dates(cls, v):
+        if len(v) > settings.cluster_max_dates:
+            raise ValueError(
+                f"dates may contain at most {settings.cluster_max_dates} items"
+            )
+        bad = next((d for d in v if not ISO_DATE.fullmatch(d)), None)
+        if bad is not None:
+            raise ValueError(f"dates must be in YYYY-MM-DD format, got {bad!r}")
+        return v
+
+    @root_validator(skip_on_failure=True)
+    def validate_power_levels(cls, values):
+        power_levels = values.get("power_levels")
+        if power_levels is not None and len(power_levels) != len(values["dates"]):
+            raise ValueError("power_levels must have one entry per date")
+        return values
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "dates": ["2024-01-03", "2024-01-05", "2024-01-20"],
+                "power_levels": [2, 3, 1],
+                "max_gap": 3,
+                "min_size": 2,
+            }
+        }
+
+
+class DateCluster(BaseModel):
+    start_date: str = Field(..., description="First date of the cluster")
+    end_date: str = Field(..., description="Last date of the cluster")
+    dates: List[str] = Field(..., description="Dates in the cluster, in order")
+    duration: int = Field(..., description="Number of dates in the cluster")
+    score: Optional[float] = Field(
+        None,
+        description="Sum of the dates' power levels, when power_levels were given",
+    )
+
+
+class DateClusterResponse(BaseModel):
+    clusters: List[DateCluster] = Field(
+        ...,
+        description="Clusters in date order",
+    )
+    total_clusters: int = Field(
+        ...,
+        description="Number of clusters found",
+        example=1,
+    )
@@ -1,20 +1,12 @@
 from typing import Tuple
 
+from api.numerology_kernel import date_number, parse_date
+
 
 def calculate_life_path_number(birth_date: str, single_digit: bool = True) -> int:
     """Calculate life path number from birth date"""
-    # Remove hyphens and convert to integers
-    numbers = [int(n) for n in birth_date.replace("-", "")]
-
-    # Sum all digits
-    total = sum(numbers)
-
-    if single_digit and total > 9:
-        # Keep reducing until we get a single digit
-        while total > 9:
-            total = sum(int(d) for d in str(total))
-
-    return total
+    year, month, day = parse_date(birth_date)
+    return date_number(year, month, day, single_digit)
 
 
 def calculate_date_number(date_str: str, single_digit: bool = True) -> int:
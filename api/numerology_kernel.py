@@ -0,0 +1,40 @@
+from typing import Tuple
+
+# Digit sums of 0..9999, which covers every year, month and day component
+_DIGIT_SUMS = bytearray(10000)
+for _n in range(1, 10000):
+    _DIGIT_SUMS[_n] = _DIGIT_SUMS[_n // 10] + _n % 10
+del _n
+
+# Largest unreduced digit sum of any date up to 9999-12-31 (9999-09-29)
+MAX_DATE_DIGIT_SUM = 56
+
+
+def digit_sum(number: int) -> int:
+    """Sum the decimal digits of a non-negative integer."""
+    if number < 10000:
+        return _DIGIT_SUMS[number]
+    total = 0
+    while number:
+        number, chunk = divmod(number, 10000)
+        total += _DIGIT_SUMS[chunk]
+    return total
+
+
+def digital_root(number: int) -> int:
+    """Reduce a non-negative integer to a single digit (9 -> 9, 10 -> 1)."""
+    if number == 0:
+        return 0
+    return 1 + (number - 1) % 9
+
+
+def date_number(year: int, month: int, day: int, single_digit: bool = True) -> int:
+    """Calculate the numerology number of a date from its components."""
+    total = digit_sum(year) + digit_sum(month) + digit_sum(day)
+    return digital_root(total) if single_digit else total
+
+
+def parse_date(value: str) -> Tuple[int, int, int]:
+    """Split a YYYY-MM-DD string into (year, month, day) integers."""
+    year, month, day = value.split("-")
+    return int(year), int(month), int(day)
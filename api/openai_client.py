@@ -0,0 +1,123 @@
+import asyncio
+import random
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+import httpx
+from openai import (
+    APIConnectionError,
+    AsyncOpenAI,
+    AsyncStream,
+    InternalServerError,
+    RateLimitError,
+)
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+from api.config import settings
+from api.logger import logger
+
+# Failures worth retrying; APITimeoutError is an APIConnectionError
+RETRYABLE_ERRORS = (APIConnectionError, RateLimitError, InternalServerError)
+
+T = TypeVar("T")
+
+_client: Optional[AsyncOpenAI] = None
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        settings.openai_read_timeout, connect=settings.openai_connect_timeout
+    )
+
+
+def create_openai_client() -> AsyncOpenAI:
+    """Create the shared OpenAI client with a pooled HTTP transport."""
+    global _client
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.openai_max_connections,
+            max_keepalive_connections=settings.openai_max_connections,
+        ),
+        timeout=_timeout(),
+    )
+    # Retries are handled by create_chat_completion
+    _client = AsyncOpenAI(
+        api_key=settings.openai_api_key,
+        base_url=settings.openai_base_url,
+        http_client=http_client,
+        timeout=_timeout(),
+        max_retries=0,
+    )
+    return _client
+
+
+def get_openai_client() -> AsyncOpenAI:
+    """Get the shared OpenAI client, creating it if startup has not."""
+    if _client is None:
+        return create_openai_client()
+    return _client
+
+
+async def close_openai_client() -> None:
+    """Close the shared OpenAI client and its connection pool."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with jitter for a 0-based retry attempt, capped."""
+    delay: float = min(
+        settings.openai_backoff_base_seconds * 2**attempt,
+        settings.openai_backoff_max_seconds,
+    )
+    return delay * random.uniform(0.5, 1.0)
+
+
+async def _with_retries(request: Callable[[], Awaitable[T]]) -> T:
+    """Await a request, retrying transient failures with backoff."""
+    for attempt in range(settings.openai_max_retries + 1):
+        try:
+            return await request()
+        except RETRYABLE_ERRORS as e:
+            if attempt == settings.openai_max_retries:
+                raise
+            delay = backoff_delay(attempt)
+            logger.info(
+                f"OpenAI request failed ({type(e).__name__}), "
+                f"retrying in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+async def create_chat_completion(**kwargs: Any) -> ChatCompletion:
+    """Create a chat completion, retrying transient failures with backoff."""
+    client = get_openai_client()
+
+    async def request() -> ChatCompletion:
+        response: ChatCompletion = await client.chat.completions.create(
+            timeout=_timeout(), **kwargs
+        )
+        return response
+
+    return await _with_retries(request)
+
+
+async def create_chat_completion_stream(
+    **kwargs: Any,
+) -> AsyncStream[ChatCompletionChunk]:
+    """Open a streaming chat completion.
+
+    Transient failures are retried until the response starts; errors once
+    chunks are flowing are raised to the caller.
+    """
+    client = get_openai_client()
+
+    async def request() -> AsyncStream[ChatCompletionChunk]:
+        stream: AsyncStream[ChatCompletionChunk] = await client.chat.completions.create(
+            timeout=_timeout(), stream=True, **kwargs
+        )
+        return stream
+
+    return await _with_retries(request)
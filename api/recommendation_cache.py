@@ -0,0 +1,94 @@
+import asyncio
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+
+from api.cache_backends import SQLiteCache
+from api.config import settings
+
+# Bump whenever the prompt text changes so stale completions are not reused
+PROMPT_VERSION = 2
+
+# Number of favorable dates included in the prompt
+PROMPT_DATES = 8
+
+_store: Optional[SQLiteCache] = None
+
+
+def prompt_fingerprint(
+    numerology_number: int,
+    zodiac_sign: str,
+    dates: List[str],
+    month: int,
+    **extra: Any,
+) -> str:
+    """Hash the normalized prompt inputs and model settings into a cache key.
+
+    Only the inputs that reach the prompt are included, so every user whose
+    profile produces the same prompt shares one completion.
+    """
+    inputs = {
+        "version": PROMPT_VERSION,
+        "numerology_number": numerology_number,
+        "zodiac_sign": zodiac_sign.strip().lower(),
+        "dates": dates[:PROMPT_DATES],
+        "month": month,
+        "model": settings.openai_model,
+        "temperature": settings.openai_temperature,
+        "max_tokens": settings.openai_max_tokens,
+        **extra,
+    }
+    encoded = json.dumps(inputs, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def get_recommendation_store() -> Optional[SQLiteCache]:
+    """Get the persistent completion store, or None if it is disabled."""
+    global _store
+    if _store is None and settings.recommendation_cache_path:
+        _store = SQLiteCache(
+            settings.recommendation_cache_path,
+            ttl=settings.recommendation_cache_ttl_seconds,
+            max_entries=settings.recommendation_cache_max_entries,
+        )
+    return _store
+
+
+async def get_cached_completion(fingerprint: str) -> Optional[str]:
+    """Get a stored completion for a prompt fingerprint."""
+    store = get_recommendation_store()
+    if store is None:
+        return None
+    # SQLite queries run in a thread to keep the event loop free
+    content: Optional[str] = await asyncio.to_thread(store.get, fingerprint)
+    return content
+
+
+async def store_completion(fingerprint: str, content: str) -> None:
+    """Persist a completion under its prompt fingerprint."""
+    store = get_recommendation_store()
+    if store is not None:
+        await asyncio.to_thread(store.set, fingerprint, content)
+
+
+def get_recommendation_cache_stats() -> Optional[Dict[str, Any]]:
+    """Get counters for the completion store, if it is enabled.
+
+    Reporting does not open the store, so counters are zero until this
+    process first uses it.
+    """
+    if not settings.recommendation_cache_path:
+        return None
+    if _store is None:
+        return {
+            "backend": "sqlite",
+            "size": 0,
+            "max_entries": settings.recommendation_cache_max_entries,
+            "hits": 0,
+            "misses": 0,
+            "hit_rate": 0.0,
+            "stale_hits": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+    return _store.stats()
@@ -0,0 +1,193 @@
+import asyncio
+import contextlib
+import time
+import uuid
+from typing import Any, Dict, Hashable, List, Mapping, Optional
+
+from api.cache import get_cached_zodiac_info
+from api.config import settings
+from api.logger import logger
+
+
+class RecommendationJob:
+    """A deferred zodiac recommendation computed by the worker pool."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    __slots__ = (
+        "job_id",
+        "birth_date",
+        "year",
+        "match_on_single_digit",
+        "numerology_number",
+        "dates",
+        "status",
+        "result",
+        "error",
+        "finished_at",
+        "finished",
+    )
+
+    def __init__(
+        self,
+        birth_date: str,
+        year: int,
+        match_on_single_digit: bool,
+        numerology_number: int,
+        dates: List[str],
+    ):
+        self.job_id = uuid.uuid4().hex
+        self.birth_date = birth_date
+        self.year = year
+        self.match_on_single_digit = match_on_single_digit
+        self.numerology_number = numerology_number
+        self.dates = dates
+        self.status = self.PENDING
+        self.result: Optional[Mapping[str, Any]] = None
+        self.error: Optional[str] = None
+        self.finished_at: Optional[float] = None
+        self.finished = asyncio.Event()
+
+    @property
+    def key(self) -> Hashable:
+        return (self.birth_date, self.year, self.match_on_single_digit)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "zodiac_sign": self.result,
+            "error": self.error,
+        }
+
+
+# Jobs by id; finished jobs are kept for settings.ai_job_ttl_seconds
+_jobs: Dict[str, RecommendationJob] = {}
+# Unfinished jobs by cache key, so repeat submissions share one job
+_pending: Dict[Hashable, RecommendationJob] = {}
+_queue: Optional["asyncio.Queue[RecommendationJob]"] = None
+_workers: List["asyncio.Task[None]"] = []
+
+
+class JobQueueFull(Exception):
+    """Raised when the recommendation job queue is at capacity."""
+
+
+def _prune_finished_jobs() -> None:
+    """Forget finished jobs older than the job TTL."""
+    cutoff = time.monotonic() - settings.ai_job_ttl_seconds
+    expired = [
+        job_id
+        for job_id, job in _jobs.items()
+        if job.finished_at is not None and job.finished_at < cutoff
+    ]
+    for job_id in expired:
+        del _jobs[job_id]
+
+
+async def _run_job(job: RecommendationJob) -> None:
+    job.status = RecommendationJob.RUNNING
+    try:
+        # Stores the result in the zodiac cache for later inline requests
+        job.result = await get_cached_zodiac_info(
+            job.birth_date,
+            job.year,
+            job.match_on_single_digit,
+            job.numerology_number,
+            job.dates,
+        )
+        job.status = RecommendationJob.DONE
+    except Exception as e:  # pylint: disable=broad-except
+        logger.error(f"Recommendation job {job.job_id} failed: {e}")
+        job.error = str(e)
+        job.status = RecommendationJob.FAILED
+    finally:
+        job.finished_at = time.monotonic()
+        _pending.pop(job.key, None)
+        job.finished.set()
+
+
+async def _work(queue: "asyncio.Queue[RecommendationJob]") -> None:
+    while True:
+        job = await queue.get()
+        try:
+            await _run_job(job)
+        finally:
+            queue.task_done()
+
+
+def start_recommendation_workers() -> None:
+    """Start the worker pool that runs deferred recommendation jobs."""
+    global _queue
+    if _workers:
+        return
+    _queue = asyncio.Queue(maxsize=settings.ai_job_queue_size)
+    for _ in range(settings.ai_job_workers):
+        _workers.append(asyncio.create_task(_work(_queue)))
+
+
+async def stop_recommendation_workers() -> None:
+    """Stop the worker pool, failing any job that has not finished."""
+    global _queue
+    for task in _workers:
+        task.cancel()
+    for task in _workers:
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    _workers.clear()
+    _queue = None
+
+    for job in list(_pending.values()):
+        job.status = RecommendationJob.FAILED
+        job.error = "Server shutting down"
+        job.finished_at = time.monotonic()
+        job.finished.set()
+    _pending.clear()
+
+
+def submit_recommendation_job(
+    birth_date: str,
+    year: int,
+    match_on_single_digit: bool,
+    numerology_number: int,
+    dates: List[str],
+) -> RecommendationJob:
+    """Queue a recommendation job, reusing an unfinished one for the same key."""
+    key = (birth_date, year, match_on_single_digit)
+    job = _pending.get(key)
+    if job is not None:
+        return job
+
+    if _queue is None:
+        start_recommendation_workers()
+    assert _queue is not None
+
+    _prune_finished_jobs()
+    job = RecommendationJob(
+        birth_date, year, match_on_single_digit, numerology_number, dates
+    )
+    try:
+        _queue.put_nowait(job)
+    except asyncio.QueueFull as e:
+        raise JobQueueFull("Too many pending recommendation jobs") from e
+    _jobs[job.job_id] = job
+    _pending[key] = job
+    return job
+
+
+def get_recommendation_job(job_id: str) -> Optional[RecommendationJob]:
+    """Get a recommendation job by id."""
+    return _jobs.get(job_id)
+
+
+def get_recommendation_job_stats() -> Dict[str, Any]:
+    """Get worker pool and job queue counters."""
+    return {
+        "workers": len(_workers),
+        "queued": _queue.qsize() if _queue is not None else 0,
+        "pending": len(_pending),
+        "tracked": len(_jobs),
+    }
@@ -0,0 +1,204 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Union
+
+import pytest
+
+from api import ai_recommendations, openai_client, recommendation_cache
+from api.circuit_breaker import CircuitBreaker
+from api.config import settings
+from api.micro_batcher import MicroBatcher
+
+
+class OpenAIStub(ThreadingHTTPServer):
+    """Local OpenAI-compatible server for chat completion tests.
+
+    Replies come from ``failures`` first (status codes to return), then
+    ``content`` is sent as the completion text after ``delay`` seconds, in
+    ``chunk_size`` pieces when the request asks for a stream. ``content`` may
+    also be a function of the request body. Requests asking for more than
+    ``max_output_tokens`` are rejected with a 400, as the real API does.
+    """
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), OpenAIStubHandler)
+        self.content: Union[
+            str, Callable[[Dict[str, Any]], str]
+        ] = "CAREER & BUSINESS\n- A recommendation long enough to keep"
+        self.delay = 0.0
+        self.chunk_size = 8
+        self.failures: List[int] = []
+        self.max_output_tokens = 4096
+        self.requests: List[Dict[str, Any]] = []
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        pass  # Clients hanging up on slow replies is expected in timeout tests
+
+    def reply(self, request: Dict[str, Any]) -> str:
+        if callable(self.content):
+            return self.content(request)
+        return self.content
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class OpenAIStubHandler(BaseHTTPRequestHandler):
+    server: OpenAIStub
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def send_json(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def usage(self, request: Dict[str, Any], content: str) -> Dict[str, int]:
+        """Approximate token usage at four characters per token."""
+        prompt = sum(len(m["content"]) for m in request["messages"]) // 4
+        completion = len(content) // 4
+        return {
+            "prompt_tokens": prompt,
+            "completion_tokens": completion,
+            "total_tokens": prompt + completion,
+        }
+
+    def send_stream(self, request: Dict[str, Any]) -> None:
+        """Send the completion as server-sent chunks of a few characters."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        content = self.server.reply(request)
+        for start in range(0, len(content), self.server.chunk_size):
+            chunk = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "delta": {
+                            "content": content[start : start + self.server.chunk_size]
+                        },
+                        "finish_reason": None,
+                    }
+                ],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+        if request.get("stream_options", {}).get("include_usage"):
+            chunk = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [],
+                "usage": self.usage(request, content),
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length))
+        self.server.requests.append(request)
+
+        if self.server.failures:
+            status = self.server.failures.pop(0)
+            self.send_json(status, {"error": {"message": "stub failure"}})
+            return
+        if request.get("max_tokens", 0) > self.server.max_output_tokens:
+            message = "max_tokens is too large for this model"
+            self.send_json(400, {"error": {"message": message}})
+            return
+
+        time.sleep(self.server.delay)
+        if request.get("stream"):
+            self.send_stream(request)
+            return
+
+        content = self.server.reply(request)
+        body: Dict[str, Any] = {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": self.usage(request, content),
+        }
+        self.send_json(200, body)
+
+
+@pytest.fixture(autouse=True)
+def recommendation_store(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> Iterator[None]:
+    """Keep the completion store in a fresh file outside the checkout."""
+    monkeypatch.setattr(
+        settings, "recommendation_cache_path", str(tmp_path / "recommendations.db")
+    )
+    monkeypatch.setattr(recommendation_cache, "_store", None)
+    yield
+    if recommendation_cache._store is not None:
+        recommendation_cache._store.close()
+
+
+@pytest.fixture
+def openai_stub(monkeypatch: pytest.MonkeyPatch) -> Iterator[OpenAIStub]:
+    """Point the shared OpenAI client at a local stub server.
+
+    The circuit breaker, micro-batcher and AI counters are reset so every
+    test reaches the stub; the recommendation_store fixture gives each test
+    an empty completion cache.
+    """
+    server = OpenAIStub()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setattr(settings, "openai_base_url", server.base_url)
+    monkeypatch.setattr(settings, "openai_read_timeout", 1.0)
+    monkeypatch.setattr(settings, "openai_backoff_base_seconds", 0.01)
+    monkeypatch.setattr(settings, "openai_backoff_max_seconds", 0.02)
+    monkeypatch.setattr(openai_client, "_client", None)
+    monkeypatch.setattr(
+        ai_recommendations,
+        "ai_breaker",
+        CircuitBreaker(
+            settings.ai_breaker_failure_threshold, settings.ai_breaker_reset_seconds
+        ),
+    )
+    monkeypatch.setattr(
+        ai_recommendations, "ai_stats", dict.fromkeys(ai_recommendations.ai_stats, 0)
+    )
+    monkeypatch.setattr(
+        ai_recommendations,
+        "ai_batcher",
+        MicroBatcher(
+            ai_recommendations._complete_prompts,
+            window=settings.ai_batch_window_seconds,
+            max_size=settings.ai_batch_max_size,
+            group=ai_recommendations.batch_group,
+        ),
+    )
+    yield server
+
+    monkeypatch.setattr(openai_client, "_client", None)
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,543 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Any, Coroutine, Dict, List, Tuple, TypeVar
+
+import pytest
+
+from api import ai_recommendations, openai_client, recommendation_cache
+from api.ai_recommendations import (
+    SectionParser,
+    build_messages,
+    build_prompt,
+    estimate_tokens,
+    fingerprint_prompt,
+    get_ai_stats,
+    get_personalized_recommendations,
+    parse_batch_response,
+    parse_enhanced_ai_response,
+    stream_personalized_recommendations,
+)
+from api.circuit_breaker import CircuitBreaker
+from api.config import settings
+from api.recommendation_cache import PROMPT_DATES
+from api.tests.conftest import OpenAIStub
+
+T = TypeVar("T")
+
+DATES = ["2024-01-03", "2024-01-12", "2024-01-21"]
+
+COMPLETION = """1. CAREER & BUSINESS
+- Launch the product on 2024-01-03 in the morning, an optimal window
+
+2. PERSONAL DEVELOPMENT & RELATIONSHIPS
+- Hold the important family conversation on 2024-01-12
+
+3. REST & REJUVENATION
+- Take a long weekend away around 2024-01-21
+
+4. FINANCIAL & LEGAL MATTERS
+- Sign contracts early in the month for the strongest terms"""
+
+
+def run(coro: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine, closing the shared OpenAI client on the same loop."""
+
+    async def main() -> T:
+        try:
+            return await coro
+        finally:
+            await openai_client.close_openai_client()
+
+    return asyncio.run(main())
+
+
+def test_recommendations_from_stub_server(openai_stub: OpenAIStub) -> None:
+    """Recommendations are parsed from the OpenAI-compatible server's reply."""
+    result = run(get_personalized_recommendations(3, "Capricorn", DATES))
+
+    assert result["career"] == ["a recommendation long enough to keep"]
+    assert len(openai_stub.requests) == 1
+    assert openai_stub.requests[0]["model"] == settings.openai_model
+
+
+def test_transient_failures_are_retried(openai_stub: OpenAIStub) -> None:
+    """Server errors are retried with backoff before succeeding."""
+    openai_stub.failures = [500, 503]
+    result = run(get_personalized_recommendations(3, "Capricorn", DATES))
+
+    assert result["career"] == ["a recommendation long enough to keep"]
+    assert len(openai_stub.requests) == 3
+
+
+def test_read_timeout_falls_back(
+    openai_stub: OpenAIStub, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A reply slower than the read deadline yields fallback recommendations."""
+    monkeypatch.setattr(settings, "openai_read_timeout", 0.2)
+    monkeypatch.setattr(settings, "openai_max_retries", 0)
+    openai_stub.delay = 0.5
+    result = run(get_personalized_recommendations(3, "Capricorn", DATES))
+
+    assert result["career"][0] == "Use your Life Path 3 energy for career advancement"
+    assert set(result["date_specific_advice"]) == set(DATES)
+
+
+def test_backoff_is_bounded(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Backoff grows exponentially but never exceeds the configured cap."""
+    monkeypatch.setattr(settings, "openai_backoff_base_seconds", 0.5)
+    monkeypatch.setattr(settings, "openai_backoff_max_seconds", 4.0)
+
+    assert 0.25 <= openai_client.backoff_delay(0) <= 0.5
+    assert 1.0 <= openai_client.backoff_delay(2) <= 2.0
+    assert openai_client.backoff_delay(10) <= 4.0
+
+
+def test_completions_cached_by_prompt_fingerprint(
+    openai_stub: OpenAIStub, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Profiles producing the same prompt share one persisted completion."""
+    year_dates = DATES + ["2024-02-02", "2024-02-11"]
+    first = run(get_personalized_recommendations(3, "Capricorn", year_dates))
+    second = run(get_personalized_recommendations(3, "capricorn ", year_dates))
+    assert len(openai_stub.requests) == 1
+    assert first == second
+
+    # The store survives a restart
+    monkeypatch.setattr(recommendation_cache, "_store", None)
+    run(get_personalized_recommendations(3, "Capricorn", year_dates))
+    assert len(openai_stub.requests) == 1
+
+    run(get_personalized_recommendations(4, "Capricorn", year_dates))
+    assert len(openai_stub.requests) == 2
+
+
+def test_fallbacks_are_not_cached(
+    openai_stub: OpenAIStub, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Fallback recommendations never land in the completion cache."""
+    monkeypatch.setattr(settings, "openai_max_retries", 0)
+    openai_stub.failures = [500]
+    run(get_personalized_recommendations(3, "Capricorn", DATES))
+    result = run(get_personalized_recommendations(3, "Capricorn", DATES))
+
+    assert len(openai_stub.requests) == 2
+    assert result["career"] == ["a recommendation long enough to keep"]
+
+
+def test_store_stats_do_not_open_the_store(tmp_path: Path) -> None:
+    """Reporting on an unused completion store leaves no database behind."""
+    stats = recommendation_cache.get_recommendation_cache_stats()
+
+    assert stats is not None
+    assert (stats["size"], stats["hits"]) == (0, 0)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_prompt_fingerprint_ignores_dates_outside_prompt() -> None:
+    """Only the dates that reach the prompt affect the fingerprint."""
+    dates = [f"2024-01-{d:02}" for d in range(1, 20)]
+    base = recommendation_cache.prompt_fingerprint(3, "Aries", dates, 5)
+
+    assert recommendation_cache.prompt_fingerprint(3, "Aries", dates[:8], 5) == base
+    assert recommendation_cache.prompt_fingerprint(3, "Aries", dates, 6) != base
+    assert recommendation_cache.prompt_fingerprint(3, "Aries", dates[1:], 5) != base
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_circuit_breaker_opens_and_recovers() -> None:
+    """The breaker opens on repeated failures and closes after a good probe."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+    # Half-open lets exactly one probe through
+    clock.now = 10
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.stats()["times_opened"] == 1
+
+
+def test_circuit_breaker_failed_probe_reopens() -> None:
+    """A failed half-open probe re-opens the breaker for another timeout."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=clock)
+    for _ in range(3):
+        breaker.record_failure()
+
+    clock.now = 10
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+    clock.now = 19
+    assert not breaker.allow_request()
+    clock.now = 20
+    assert breaker.allow_request()
+
+
+def test_open_breaker_skips_upstream(
+    openai_stub: OpenAIStub, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Once failures trip the breaker, requests fall back without a call."""
+    monkeypatch.setattr(settings, "openai_max_retries", 0)
+    monkeypatch.setattr(
+        ai_recommendations, "ai_breaker", CircuitBreaker(2, reset_timeout=60)
+    )
+    openai_stub.failures = [500, 500]
+    for _ in range(4):
+        result = run(get_personalized_recommendations(3, "Capricorn", DATES))
+
+    assert result["career"][0] == "Use your Life Path 3 energy for career advancement"
+    assert len(openai_stub.requests) == 2
+    stats = get_ai_stats()
+    assert stats["failures"] == 2
+    assert stats["short_circuited"] == 2
+    assert stats["fallback_rate"] == 1.0
+    assert stats["breaker"]["state"] == CircuitBreaker.OPEN
+
+
+def test_latency_budget_falls_back(
+    openai_stub: OpenAIStub, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Slow completions are abandoned once the latency budget is spent."""
+    monkeypatch.setattr(settings, "ai_latency_budget_seconds", 0.1)
+    openai_stub.delay = 0.5
+
+    started = time.perf_counter()
+    result = run(get_personalized_recommendations(3, "Capricorn", DATES))
+
+    assert time.perf_counter() - started < 0.4
+    assert result["career"][0] == "Use your Life Path 3 energy for career advancement"
+    assert get_ai_stats()["timeouts"] == 1
+
+
+def collect(coro_gen: Any) -> List[Tuple[str, Any]]:
+    async def main() -> List[Tuple[str, Any]]:
+        try:
+            return [event async for event in coro_gen]
+        finally:
+            await openai_client.close_openai_client()
+
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 64, len(COMPLETION)])
+def test_section_parser_matches_full_parse(chunk_size: int) -> None:
+    """Sections found incrementally match those of the whole completion."""
+    parser = SectionParser()
+    sections = []
+    for start in range(0, len(COMPLETION), chunk_size):
+        sections.extend(parser.feed(COMPLETION[start : start + chunk_size]))
+    sections.extend(parser.close())
+
+    assert sections == SectionParser().close(COMPLETION)
+    assert [s["category"] for s in sections] == [
+        "career",
+        "personal",
+        "rest",
+        "financial",
+    ]
+    full = parse_enhanced_ai_response(COMPLETION, DATES)
+    for section in sections:
+        assert full[section["category"]] == section["recommendations"]
+
+
+def test_stream_recommendations(openai_stub: OpenAIStub) -> None:
+    """Tokens are forwarded, sections parsed early, and the result cached."""
+    openai_stub.content = COMPLETION
+    events = collect(stream_personalized_recommendations(3, "Capricorn", DATES))
+
+    names = [name for name, _ in events]
+    assert names[-1] == "result"
+    # The career block is complete before the completion finishes
+    assert names.index("section") < len(names) - names[::-1].index("token") - 1
+    assert "".join(data for name, data in events if name == "token") == COMPLETION
+    assert events[-1][1] == parse_enhanced_ai_response(COMPLETION, DATES)
+    assert openai_stub.requests[0]["stream"] is True
+
+    # The streamed completion is reused by the non-streaming path
+    assert run(get_personalized_recommendations(3, "Capricorn", DATES)) == (
+        events[-1][1]
+    )
+    assert len(openai_stub.requests) == 1
+
+
+def test_stream_recommendations_falls_back(
+    openai_stub: OpenAIStub, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A failed stream ends with fallback recommendations."""
+    monkeypatch.setattr(settings, "openai_max_retries", 0)
+    openai_stub.failures = [500]
+    events = collect(stream_personalized_recommendations(3, "Capricorn", DATES))
+
+    assert [name for name, _ in events] == ["result"]
+    assert events[0][1]["career"][0] == (
+        "Use your Life Path 3 energy for career advancement"
+    )
+    assert get_ai_stats()["fallbacks"] == 1
+
+
+def batch_reply(request: Dict[str, Any]) -> str:
+    """Answer batched prompts with JSON and single prompts with plain text."""
+    prompt = request["messages"][1]["content"]
+    if "response_format" not in request:
+        return f"CAREER & BUSINESS\n- Single answer for this profile: {prompt[-20:]}"
+    count = prompt.count("- id ")
+    return json.dumps(
+        {
+            "profiles": [
+                {
+                    "id": i,
+                    "recommendations": (
+                        f"CAREER & BUSINESS\n- Batched answer for profile {i}"
+                    ),
+                }
+                for i in range(count)
+            ]
+        }
+    )
+
+
+def test_concurrent_prompts_are_batched(openai_stub: OpenAIStub) -> None:
+    """Concurrent distinct prompts share one upstream request."""
+    openai_stub.content = batch_reply
+
+    async def main() -> List[Dict[str, Any]]:
+        return await asyncio.gather(
+            *(
+                get_personalized_recommendations(number, "Capricorn", DATES)
+                for number in (1, 2, 3, 1, 2)
+            )
+        )
+
+    results = run(main())
+
+    assert len(openai_stub.requests) == 1
+    assert openai_stub.requests[0]["response_format"] == {"type": "json_object"}
+    assert [r["career"] for r in results] == [
+        ["batched answer for profile 0"],
+        ["batched answer for profile 1"],
+        ["batched answer for profile 2"],
+        ["batched answer for profile 0"],
+        ["batched answer for profile 1"],
+    ]
+    stats = get_ai_stats()["batching"]
+    assert stats["batches"] == 1
+    assert stats["deduplicated"] == 2
+
+
+def test_failed_batch_counts_once(
+    openai_stub: OpenAIStub, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A failed batched request is one upstream call and one breaker failure."""
+    monkeypatch.setattr(settings, "openai_max_retries", 0)
+    openai_stub.failures = [500]
+
+    async def main() -> List[Dict[str, Any]]:
+        return await asyncio.gather(
+            *(
+                get_personalized_recommendations(number, "Capricorn", DATES)
+                for number in range(1, 7)
+            )
+        )
+
+    run(main())
+
+    assert len(openai_stub.requests) == 1
+    stats = get_ai_stats()
+    assert stats["upstream_calls"] == 1
+    assert stats["failures"] == 6
+    assert stats["breaker"]["consecutive_failures"] == 1
+    assert stats["breaker"]["state"] == CircuitBreaker.CLOSED
+
+
+def test_profiles_missing_from_batch_are_retried_singly(
+    openai_stub: OpenAIStub,
+) -> None:
+    """Profiles left out of a batched answer get their own completion."""
+
+    def reply(request: Dict[str, Any]) -> str:
+        if "response_format" in request:
+            return json.dumps(
+                {"profiles": [{"id": 0, "recommendations": "CAREER\n- Batched x"}]}
+            )
+        return "CAREER & BUSINESS\n- A single completion for the missing profile"
+
+    openai_stub.content = reply
+
+    async def main() -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        return await asyncio.gather(
+            get_personalized_recommendations(1, "Capricorn", DATES),
+            get_personalized_recommendations(2, "Capricorn", DATES),
+        )
+
+    _, second = run(main())
+
+    assert len(openai_stub.requests) == 2
+    assert second["career"] == ["a single completion for the missing profile"]
+
+
+def test_batches_stay_within_model_output_limit(openai_stub: OpenAIStub) -> None:
+    """Batches asking for more output than the model allows are split."""
+    openai_stub.content = batch_reply
+    prompts = [
+        build_prompt(number, "Capricorn", DATES, 6, structured=True)
+        for number in range(1, 6)
+    ]
+
+    texts = run(ai_recommendations._complete_prompts(prompts))
+
+    assert len(texts) == 5
+    assert sorted(r["max_tokens"] for r in openai_stub.requests) == [2400, 3600]
+    assert all(
+        r["max_tokens"] <= settings.openai_max_output_tokens
+        for r in openai_stub.requests
+    )
+
+
+def test_output_modes_are_not_batched_together(openai_stub: OpenAIStub) -> None:
+    """Structured and text prompts for the same month go out separately."""
+    openai_stub.content = "CAREER & BUSINESS\n- An answer for a single prompt"
+    prompts = [
+        build_prompt(1, "Capricorn", DATES, 6, structured)
+        for structured in (True, False)
+    ]
+
+    async def main() -> List[str]:
+        return await asyncio.gather(
+            *(
+                ai_recommendations.ai_batcher.submit(fingerprint_prompt(p), p)
+                for p in prompts
+            )
+        )
+
+    run(main())
+
+    assert len(openai_stub.requests) == 2
+    assert all("- id " not in r["messages"][1]["content"] for r in openai_stub.requests)
+    assert ai_recommendations.ai_batcher.stats()["batches"] == 2
+
+
+def test_parse_batch_response_skips_malformed_entries() -> None:
+    """Only well-formed profile entries within range are returned."""
+    content = json.dumps(
+        {
+            "profiles": [
+                {"id": 0, "recommendations": "a"},
+                {"id": 5, "recommendations": "b"},
+                {"id": 1, "recommendations": None},
+                "junk",
+            ]
+        }
+    )
+    assert parse_batch_response(content, 2) == {0: "a"}
+    assert parse_batch_response("not json", 2) == {}
+
+
+STRUCTURED = {
+    "career": ["Pitch the new client on 2024-01-03", 42, "  "],
+    "personal": ["Call family on 2024-01-12"],
+    "rest": [],
+    "financial": ["Review the budget"],
+    "dates": {
+        "2024-01-03": {
+            "activities": ["Pitch"],
+            "timing": "morning",
+            "power_level": 3,
+            "category": "career",
+        },
+        "2024-01-05": {"activities": [], "power_level": 2, "category": "career"},
+        "2024-01-12": {"activities": ["Call"], "power_level": 1, "category": "x"},
+        "2030-01-01": {"activities": ["Not one of the dates"], "power_level": 3},
+    },
+}
+
+
+def test_structured_output_mode(
+    openai_stub: OpenAIStub, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Structured mode requests compact JSON and validates the answer."""
+    monkeypatch.setattr(settings, "ai_output_mode", "json")
+    openai_stub.content = json.dumps(STRUCTURED)
+    dates = ["2024-01-03", "2024-01-05", "2024-01-12"]
+    result = run(get_personalized_recommendations(3, "Capricorn", dates))
+
+    request = openai_stub.requests[0]
+    assert request["response_format"] == {"type": "json_object"}
+    assert request["max_tokens"] == settings.openai_json_max_tokens
+    assert result["career"] == ["Pitch the new client on 2024-01-03"]
+    assert result["rest"] == []
+    assert list(result["date_specific_advice"]) == dates
+    assert result["date_specific_advice"]["2024-01-12"]["category"] is None
+    assert result["date_specific_advice"]["2024-01-05"]["timing"] is None
+    assert [p["dates"] for p in result["power_periods"]] == [dates[:2]]
+
+    # Cached per output mode
+    run(get_personalized_recommendations(3, "Capricorn", dates))
+    assert len(openai_stub.requests) == 1
+    monkeypatch.setattr(settings, "ai_output_mode", "text")
+    run(get_personalized_recommendations(3, "Capricorn", dates))
+    assert len(openai_stub.requests) == 2
+
+
+def test_invalid_structured_output_falls_back(
+    openai_stub: OpenAIStub, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Unparseable structured answers fall back and are not cached."""
+    monkeypatch.setattr(settings, "ai_output_mode", "json")
+    openai_stub.content = "Sorry, here are some thoughts"
+    run(get_personalized_recommendations(3, "Capricorn", DATES))
+    result = run(get_personalized_recommendations(3, "Capricorn", DATES))
+
+    assert result["career"][0] == "Use your Life Path 3 energy for career advancement"
+    assert len(openai_stub.requests) == 2
+    assert get_ai_stats()["invalid_responses"] == 2
+
+
+@pytest.mark.parametrize("structured", [False, True])
+def test_prompt_trimmed_to_token_budget(
+    structured: bool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Dates are dropped from the prompt until it fits the token budget."""
+    dates = [f"2024-01-{d:02}" for d in range(1, 20)]
+    full = build_prompt(3, "Leo", dates, 5, structured)
+    assert len(full.dates) == PROMPT_DATES
+    full_tokens = estimate_tokens(build_messages(full))
+
+    monkeypatch.setattr(settings, "ai_prompt_token_budget", full_tokens - 5)
+    trimmed = build_prompt(3, "Leo", dates, 5, structured)
+    assert trimmed.dates == full.dates[: len(trimmed.dates)]
+    assert 1 <= len(trimmed.dates) < PROMPT_DATES
+    assert estimate_tokens(build_messages(trimmed)) <= full_tokens - 5
+
+    monkeypatch.setattr(settings, "ai_prompt_token_budget", 1)
+    assert len(build_prompt(3, "Leo", dates, 5, structured).dates) == 1
+
+
+def test_token_usage_is_counted(openai_stub: OpenAIStub) -> None:
+    """Prompt and completion tokens from every upstream reply are exported."""
+    openai_stub.content = COMPLETION
+    run(get_personalized_recommendations(3, "Capricorn", DATES))
+    collect(stream_personalized_recommendations(4, "Capricorn", DATES))
+
+    stats = get_ai_stats()
+    assert stats["usage_reports"] == 2
+    assert stats["completion_tokens"] == 2 * (len(COMPLETION) // 4)
+    assert stats["avg_prompt_tokens"] == stats["prompt_tokens"] / 2 > 100
@@ -0,0 +1,176 @@
+import random
+import time
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+from api.ai_recommendations import find_date_clusters, parse_enhanced_ai_response
+
+
+def legacy_parse_enhanced_ai_response(
+    content: str, available_dates: List[str]
+) -> Dict[str, Any]:
+    """Nested-loop parser the single pass replaced, kept as the reference."""
+    sections = content.lower().split("\n\n")
+    recommendations: Dict[str, Any] = {
+        "career": [],
+        "personal": [],
+        "rest": [],
+        "financial": [],
+        "power_periods": [],
+        "date_specific_advice": {},
+    }
+
+    current_category = None
+    for section in sections:
+        if "career" in section or "business" in section:
+            current_category = "career"
+        elif "personal" in section or "relationship" in section:
+            current_category = "personal"
+        elif "rest" in section or "rejuvenation" in section:
+            current_category = "rest"
+        elif "financial" in section or "legal" in section:
+            current_category = "financial"
+
+        for date_str in available_dates:
+            if date_str.lower() in section.lower():
+                date_info: Dict[str, Any] = {
+                    "activities": [],
+                    "timing": None,
+                    "power_level": None,
+                    "category": current_category,
+                }
+                for indicator in [
+                    "morning",
+                    "afternoon",
+                    "evening",
+                    "night",
+                    "noon",
+                    "dawn",
+                    "dusk",
+                ]:
+                    if indicator in section.lower():
+                        date_info["timing"] = indicator
+                date_info["activities"] = [
+                    line.strip("- ").strip()
+                    for line in section.split("\n")
+                    if line.strip().startswith("-") and len(line) > 20
+                ]
+                date_info["power_level"] = sum(
+                    1
+                    for word in ["powerful", "optimal", "perfect", "ideal", "strongest"]
+                    if word in section.lower()
+                )
+                recommendations["date_specific_advice"][date_str] = date_info
+
+        if current_category:
+            lines = [
+                line.strip("- ").strip()
+                for line in section.split("\n")
+                if line.strip().startswith("-") and len(line) > 20
+            ]
+            recommendations[current_category].extend(lines)
+
+    power_dates = [
+        d
+        for d, info in recommendations["date_specific_advice"].items()
+        if info["power_level"] > 1
+    ]
+    recommendations["power_periods"] = find_date_clusters(power_dates)
+    return recommendations
+
+
+HEADINGS = [
+    "1. CAREER & BUSINESS",
+    "2. PERSONAL DEVELOPMENT & RELATIONSHIPS",
+    "3. REST & REJUVENATION",
+    "4. FINANCIAL & LEGAL MATTERS",
+    "Notes",
+]
+WORDS = [
+    "Schedule",
+    "meetings",
+    "in the",
+    "Morning",
+    "afternoon",
+    "evening",
+    "at Dusk",
+    "an optimal",
+    "a POWERFUL",
+    "perfect",
+    "ideal",
+    "strongest",
+    "window",
+    "fortnight",
+    "-",
+]
+
+
+def year_of_dates(year: int) -> List[str]:
+    start = date(year, 1, 1)
+    return [(start + timedelta(days=i)).isoformat() for i in range(365)]
+
+
+def synthetic_completion(rng: random.Random, dates: List[str], sections: int) -> str:
+    """Build a completion with headings, bullets, prose and date mentions."""
+    blocks = []
+    for _ in range(sections):
+        lines = []
+        if rng.random() < 0.3:
+            lines.append(rng.choice(HEADINGS))
+        for _ in range(rng.randint(1, 5)):
+            words = rng.sample(WORDS, rng.randint(1, 6))
+            if rng.random() < 0.6:
+                words.append(rng.choice(dates))
+            prefix = rng.choice(["- ", "  - ", "", "* "])
+            lines.append(prefix + " ".join(words))
+        blocks.append("\n".join(lines))
+    return rng.choice(["\n\n", "\n\n\n"]).join(blocks)
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_parser_matches_legacy(seed: int) -> None:
+    """Single-pass and nested-loop parsers produce identical output."""
+    rng = random.Random(seed)
+    dates = year_of_dates(2024)
+    available = rng.sample(dates, rng.randint(0, 60)) + rng.sample(dates, 3)
+    content = synthetic_completion(rng, dates, rng.randint(1, 40))
+
+    expected = legacy_parse_enhanced_ai_response(content, available)
+    result = parse_enhanced_ai_response(content, available)
+    assert result == expected
+    assert list(result["date_specific_advice"]) == list(
+        expected["date_specific_advice"]
+    )
+
+
+def test_parser_handles_non_iso_dates() -> None:
+    """Dates outside YYYY-MM-DD still match by substring."""
+    content = "CAREER\n- Launch on Jan 3rd in the morning, an ideal and optimal day"
+    available = ["Jan 3rd", "2024-01-03"]
+
+    assert parse_enhanced_ai_response(
+        content, available
+    ) == legacy_parse_enhanced_ai_response(content, available)
+
+
+@pytest.mark.performance
+def test_parser_speedup() -> None:
+    """Benchmark both parsers on a large completion over a year of dates."""
+    rng = random.Random(0)
+    dates = year_of_dates(2024)
+    content = synthetic_completion(rng, dates, 400)
+
+    def per_call_ms(func: Callable[[], Any], iterations: int = 5) -> float:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return (time.perf_counter() - start) / iterations * 1e3
+
+    legacy = per_call_ms(lambda: legacy_parse_enhanced_ai_response(content, dates))
+    single = per_call_ms(lambda: parse_enhanced_ai_response(content, dates))
+
+    print(f"\nLegacy parser: {legacy:.2f}ms/call ({len(content)} chars, 365 dates)")
+    print(f"Single-pass parser: {single:.2f}ms/call ({legacy/single:.1f}x)")
+    assert single * 2 < legacy
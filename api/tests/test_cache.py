@@ -0,0 +1,277 @@
+import asyncio
+import threading
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Mapping, Optional, Tuple
+
+import pytest
+
+from api import cache
+from api.cache import TTLCache
+from api.cache_snapshot import read_snapshot
+
+
+class FakeClock:
+    """Manually advanced clock for expiry tests."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_eviction_by_entry_count() -> None:
+    """Least recently used entries are evicted once max_entries is exceeded."""
+    lru = TTLCache(ttl=None, max_entries=2)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    assert lru.get("a") == 1  # "b" is now least recently used
+    lru.set("c", 3)
+
+    assert "b" not in lru
+    assert lru.get("a") == 1
+    assert lru.get("c") == 3
+    assert lru.stats()["evictions"] == 1
+
+
+def test_eviction_by_byte_budget() -> None:
+    """Entries are evicted once their approximate size exceeds max_bytes."""
+    lru = TTLCache(ttl=None, max_entries=100, max_bytes=2000)
+    for i in range(10):
+        lru.set(i, ["2024-01-01"] * 20)
+
+    stats = lru.stats()
+    assert 0 < stats["bytes"] <= 2000
+    assert stats["size"] < 10
+    assert stats["evictions"] == 10 - stats["size"]
+    assert 9 in lru
+
+
+def test_ttl_expiry_and_sweep() -> None:
+    """Expired entries miss on read and are removed by sweep."""
+    clock = FakeClock()
+    ttl_cache = TTLCache(ttl=60, max_entries=10, clock=clock)
+    ttl_cache.set("a", {"name": "Aries"})
+    ttl_cache.set("b", {"name": "Leo"})
+
+    clock.now += 30
+    assert ttl_cache.get("a") == {"name": "Aries"}
+
+    clock.now += 31
+    assert ttl_cache.get("a") is None
+    assert ttl_cache.sweep() == 1
+    assert len(ttl_cache) == 0
+    assert ttl_cache.bytes == 0
+
+    stats = ttl_cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expirations"]) == (1, 1, 2)
+
+
+def test_cache_sweeper_runs_in_background(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The sweeper task drops expired entries until it is stopped."""
+    swept: List[int] = []
+    monkeypatch.setattr(cache.settings, "cache_sweep_interval_seconds", 0.01)
+
+    def sweep() -> int:
+        swept.append(1)
+        return 0
+
+    monkeypatch.setattr(cache._cache, "sweep", sweep)
+
+    async def run() -> None:
+        cache.start_cache_sweeper()
+        await asyncio.sleep(0.05)
+        await cache.stop_cache_sweeper()
+
+    asyncio.run(run())
+    assert len(swept) >= 2
+    assert cache._sweeper_task is None
+
+
+def test_single_flight_coalesces_concurrent_misses(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Concurrent misses for one key run a single computation."""
+    calls: List[str] = []
+
+    async def slow_zodiac_info(
+        birth_date: str, year: int, number: int, dates: List[str]
+    ) -> Dict[str, Any]:
+        calls.append(birth_date)
+        await asyncio.sleep(0.01)
+        return {"name": "Capricorn"}
+
+    monkeypatch.setattr(cache, "calculate_zodiac_info", slow_zodiac_info)
+    monkeypatch.setattr(cache, "_cache", TTLCache(ttl=60, max_entries=10))
+
+    async def run() -> List[Mapping[str, Any]]:
+        return await asyncio.gather(
+            *(
+                cache.get_cached_zodiac_info("1990-01-01", 2024, True, 3, [])
+                for _ in range(10)
+            )
+        )
+
+    results = asyncio.run(run())
+    assert calls == ["1990-01-01"]
+    assert all(result == {"name": "Capricorn"} for result in results)
+    assert cache._inflight == {}
+
+
+def test_blocking_backend_runs_off_event_loop(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Backends doing blocking I/O are called from a worker thread."""
+    threads: List[threading.Thread] = []
+
+    class BlockingCache(TTLCache):
+        blocking = True
+
+        def get(self, key: Hashable) -> Any:
+            threads.append(threading.current_thread())
+            return super().get(key)
+
+    monkeypatch.setattr(cache, "_cache", BlockingCache(ttl=60, max_entries=10))
+    asyncio.run(cache.peek_cached_zodiac_info("1990-01-01", 2024, True))
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_failing_backend_recomputes(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Backend errors are treated as misses and skipped writes."""
+
+    class DownCache(TTLCache):
+        def get(self, key: Hashable) -> Any:
+            raise ConnectionError("Redis connection closed")
+
+        def get_stale(self, key: Hashable) -> Any:
+            raise ConnectionError("Redis connection closed")
+
+        def set(
+            self, key: Hashable, value: Any, stored_at: Optional[float] = None
+        ) -> None:
+            raise ConnectionError("Redis connection closed")
+
+    async def zodiac_info(
+        birth_date: str, year: int, number: int, dates: List[str]
+    ) -> Dict[str, Any]:
+        return {"name": "Capricorn"}
+
+    monkeypatch.setattr(cache, "calculate_zodiac_info", zodiac_info)
+    monkeypatch.setattr(cache, "_cache", DownCache(ttl=60, max_entries=10))
+
+    async def run() -> Tuple[Any, Any]:
+        return (
+            await cache.peek_cached_zodiac_info("1990-01-01", 2024, True),
+            await cache.get_cached_zodiac_info("1990-01-01", 2024, True, 3, []),
+        )
+
+    assert asyncio.run(run()) == (None, {"name": "Capricorn"})
+
+
+def test_single_flight_propagates_exceptions() -> None:
+    """Every waiter sees the computation's exception and the key is retried."""
+    calls: List[int] = []
+
+    async def failing() -> int:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream failed")
+
+    async def run() -> list:
+        return await asyncio.gather(
+            *(cache.single_flight("key", failing) for _ in range(5)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert "key" not in cache._inflight
+
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_single_flight_survives_waiter_cancellation() -> None:
+    """Cancelling one waiter does not cancel the shared computation."""
+
+    async def compute() -> str:
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def run() -> str:
+        first = asyncio.create_task(cache.single_flight("key", compute))
+        second = asyncio.create_task(cache.single_flight("key", compute))
+        await asyncio.sleep(0.005)
+        first.cancel()
+        result = await second
+        assert first.cancelled()
+        return result
+
+    assert asyncio.run(run()) == "done"
+
+
+def test_stale_while_revalidate(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Expired values are served while a background task refreshes them."""
+    clock = FakeClock()
+    stale_cache = TTLCache(ttl=60, max_entries=10, stale_ttl=600, clock=clock)
+    monkeypatch.setattr(cache, "_cache", stale_cache)
+    refreshed: List[str] = []
+
+    async def fresh_zodiac_info(
+        birth_date: str, year: int, number: int, dates: List[str]
+    ) -> Dict[str, Any]:
+        refreshed.append(birth_date)
+        return {"name": "fresh"}
+
+    monkeypatch.setattr(cache, "calculate_zodiac_info", fresh_zodiac_info)
+    key = cache._make_cache_key("1990-01-01", 2024, True)
+    stale_cache.set(key, {"name": "stale"})
+    clock.now += 120
+
+    async def run() -> Mapping[str, Any]:
+        served = await cache.get_cached_zodiac_info("1990-01-01", 2024, True, 3, [])
+        await asyncio.sleep(0)  # Let the refresh task run
+        await asyncio.sleep(0)
+        return served
+
+    assert asyncio.run(run()) == {"name": "stale"}
+    assert refreshed == ["1990-01-01"]
+    assert stale_cache.get(key) == {"name": "fresh"}
+    assert stale_cache.stats()["stale_hits"] == 1
+
+    clock.now += 1000
+    assert stale_cache.get_stale(key) is None
+
+
+def test_snapshot_round_trip_skips_expired(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """Snapshots restore live entries with their age and drop expired ones."""
+    clock = FakeClock()
+    source = TTLCache(ttl=60, max_entries=10, clock=clock)
+    monkeypatch.setattr(cache, "_cache", source)
+    source.set("old", {"name": "Aries"})
+    clock.now += 50
+    source.set("new", {"name": "Leo", "dates": ["2024-01-01"] * 100})
+
+    path = str(tmp_path / "cache.snapshot")
+    assert cache.save_cache_snapshot(path) == 2
+
+    # Restart 20 seconds later: "old" is now 70 seconds old and has expired
+    clock.now += 20
+    target = TTLCache(ttl=60, max_entries=10, clock=clock)
+    monkeypatch.setattr(cache, "_cache", target)
+    restored = asyncio.run(cache.restore_cache_snapshot(path, chunk_size=1))
+
+    assert restored == 1
+    assert "old" not in target
+    assert target.get("new") == {"name": "Leo", "dates": ["2024-01-01"] * 100}
+    clock.now += 45
+    assert target.get("new") is None  # Keeps its original write time
+
+
+def test_snapshot_rejects_foreign_files(tmp_path: Path) -> None:
+    """Restoring from a file that is not a snapshot fails loudly."""
+    path = tmp_path / "cache.snapshot"
+    path.write_bytes(b"not a snapshot")
+    with pytest.raises(ValueError):
+        list(read_snapshot(str(path)))
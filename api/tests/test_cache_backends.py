@@ -0,0 +1,250 @@
+import fnmatch
+import socketserver
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import pytest
+
+from api.cache_backends import (
+    CacheBackend,
+    RedisCache,
+    SQLiteCache,
+    TTLCache,
+    create_cache_backend,
+    decode_value,
+    encode_value,
+)
+from api.config import Settings
+
+
+class FakeClock:
+    """Manually advanced clock for expiry tests."""
+
+    def __init__(self) -> None:
+        self.now = time.time()
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RedisStandIn(socketserver.ThreadingTCPServer):
+    """Minimal in-memory server speaking the subset of RESP RedisCache uses."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), RedisStandInHandler)
+        # {key: (value, expires_at)}
+        self.data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        # Every key ever set, in order, so SCAN cursors survive deletes
+        self.order: List[bytes] = []
+        self.lock = threading.Lock()
+
+    def live(self, key: bytes) -> Optional[bytes]:
+        entry = self.data.get(key)
+        if entry is None or (entry[1] is not None and time.time() >= entry[1]):
+            self.data.pop(key, None)
+            return None
+        return entry[0]
+
+
+class RedisStandInHandler(socketserver.StreamRequestHandler):
+    server: RedisStandIn
+
+    def read_command(self) -> Optional[List[bytes]]:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self) -> None:
+        while True:
+            args = self.read_command()
+            if args is None:
+                return
+            with self.server.lock:
+                self.wfile.write(self.run(args[0].upper(), args[1:]))
+
+    def run(self, command: bytes, args: List[bytes]) -> bytes:
+        server = self.server
+        if command == b"SET":
+            expires_at = None
+            if len(args) == 4 and args[2].upper() == b"PX":
+                expires_at = time.time() + int(args[3]) / 1000
+            if args[0] not in server.order:
+                server.order.append(args[0])
+            server.data[args[0]] = (args[1], expires_at)
+            return b"+OK\r\n"
+        if command == b"GET":
+            value = server.live(args[0])
+            if value is None:
+                return b"$-1\r\n"
+            return b"$%d\r\n%s\r\n" % (len(value), value)
+        if command == b"DEL":
+            removed = sum(server.data.pop(key, None) is not None for key in args)
+            return b":%d\r\n" % removed
+        if command == b"SCAN":
+            cursor = int(args[0])
+            options = {
+                name.upper(): value
+                for name, value in zip(args[1::2], args[2::2], strict=True)
+            }
+            pattern = options.get(b"MATCH", b"*").decode()
+            count = int(options.get(b"COUNT", b"10"))
+            end = cursor + count
+            next_cursor = b"%d" % end if end < len(server.order) else b"0"
+            page = [
+                k
+                for k in server.order[cursor:end]
+                if server.live(k) is not None
+                and fnmatch.fnmatchcase(k.decode(), pattern)
+            ]
+            return (
+                b"*2\r\n$%d\r\n%s\r\n" % (len(next_cursor), next_cursor)
+                + b"*%d\r\n" % len(page)
+                + b"".join(b"$%d\r\n%s\r\n" % (len(k), k) for k in page)
+            )
+        return b"-ERR unknown command\r\n"
+
+
+@pytest.fixture
+def redis_url() -> Iterator[str]:
+    """Run a local Redis stand-in for the duration of a test."""
+    server = RedisStandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"redis://127.0.0.1:{server.server_address[1]}/0"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def make_backend(
+    request: pytest.FixtureRequest, tmp_path: Path, redis_url: str
+) -> Callable[..., CacheBackend]:
+    """Build each backend kind with a given TTL, stale window and clock."""
+
+    def make(ttl: float, stale_ttl: float, clock: FakeClock) -> CacheBackend:
+        if request.param == "memory":
+            return TTLCache(ttl=ttl, max_entries=100, stale_ttl=stale_ttl, clock=clock)
+        if request.param == "sqlite":
+            return SQLiteCache(
+                str(tmp_path / "cache.db"),
+                ttl=ttl,
+                max_entries=100,
+                stale_ttl=stale_ttl,
+                clock=clock,
+            )
+        return RedisCache(redis_url, ttl=ttl, stale_ttl=stale_ttl, clock=clock)
+
+    return make
+
+
+def test_backend_round_trip(make_backend: Callable[..., CacheBackend]) -> None:
+    """Every backend stores, returns, counts and clears values."""
+    backend = make_backend(ttl=60, stale_ttl=0, clock=FakeClock())
+    value = {"name": "Aries", "favorable_dates": [], "recommendations": {"rest": []}}
+
+    assert backend.get("1990-01-01:2024:True") is None
+    backend.set("1990-01-01:2024:True", value)
+    assert backend.get("1990-01-01:2024:True") == value
+    assert len(backend) == 1
+
+    stats = backend.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    backend.clear()
+    assert len(backend) == 0
+
+
+def test_backend_ttl_and_stale_window(
+    make_backend: Callable[..., CacheBackend]
+) -> None:
+    """Values past the TTL are only available through get_stale."""
+    clock = FakeClock()
+    backend = make_backend(ttl=60, stale_ttl=600, clock=clock)
+    backend.set("key", {"name": "Leo"})
+
+    clock.now += 120
+    assert backend.get("key") is None
+    assert backend.get_stale("key") == {"name": "Leo"}
+
+
+def test_sqlite_backend_shared_between_connections(tmp_path: Path) -> None:
+    """Two SQLite backends on one file (as in two workers) share entries."""
+    path = str(tmp_path / "shared.db")
+    first = SQLiteCache(path, ttl=60, max_entries=100)
+    second = SQLiteCache(path, ttl=60, max_entries=100)
+
+    first.set("key", {"name": "Virgo"})
+    assert second.get("key") == {"name": "Virgo"}
+
+
+def test_sqlite_backend_evicts_least_recently_used(tmp_path: Path) -> None:
+    """The SQLite backend trims least recently used rows beyond the cap."""
+    clock = FakeClock()
+    backend = SQLiteCache(str(tmp_path / "lru.db"), ttl=60, max_entries=2, clock=clock)
+    for key in ("a", "b", "c"):
+        clock.now += 1
+        backend.set(key, key)
+    clock.now += 1
+    backend.get("a")
+
+    backend.sweep()
+    assert len(backend) == 2
+    assert backend.get("b") is None
+    assert backend.stats()["evictions"] == 1
+
+
+def test_sqlite_backend_hits_do_not_write(tmp_path: Path) -> None:
+    """Access times of hits are batched rather than written on every get."""
+    backend = SQLiteCache(str(tmp_path / "hits.db"), ttl=60, max_entries=100)
+    backend.set("key", {"name": "Libra"})
+    changes = backend._db.total_changes
+
+    for _ in range(10):
+        assert backend.get("key") == {"name": "Libra"}
+    assert backend._db.total_changes == changes
+
+
+def test_redis_backend_scans_keys_in_pages(redis_url: str) -> None:
+    """Counting and clearing walk the keyspace with SCAN across several pages."""
+    backend = RedisCache(redis_url, ttl=60)
+    backend.SCAN_COUNT = 2
+    for key in "abcde":
+        backend.set(key, key)
+    other = RedisCache(redis_url, ttl=60, prefix="other:")
+    other.set("a", "a")
+
+    assert len(backend) == 5
+    backend.clear()
+    assert len(backend) == 0
+    assert len(other) == 1
+
+
+def test_value_encoding_is_compact() -> None:
+    """Small values stay plain JSON and large values are compressed."""
+    small = {"name": "Aries"}
+    large = {"dates": [f"2024-01-{d:02}" for d in range(1, 32)] * 10}
+
+    assert encode_value(small) == b'j{"name":"Aries"}'
+    assert encode_value(large)[:1] == b"z"
+    assert len(encode_value(large)) < len(str(large)) / 4
+    assert decode_value(encode_value(small)) == small
+    assert decode_value(encode_value(large)) == large
+
+
+def test_backend_selected_from_settings(tmp_path: Path) -> None:
+    """Settings choose the cache backend."""
+    settings = Settings(cache_backend="sqlite", cache_sqlite_path=str(tmp_path / "x"))
+    assert isinstance(create_cache_backend(settings), SQLiteCache)
+    assert isinstance(create_cache_backend(Settings()), TTLCache)
+    with pytest.raises(ValueError):
+        create_cache_backend(Settings(cache_backend="memcached"))
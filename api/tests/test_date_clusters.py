@@ -0,0 +1,125 @@
+import random
+import time
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+from api.date_clusters import cluster_dates
+
+
+def legacy_find_date_clusters(
+    dates: List[str], max_gap: int = 3
+) -> List[Dict[str, Any]]:
+    """strptime-based clustering the ordinal engine replaced, kept as the reference."""
+    if not dates:
+        return []
+
+    sorted_dates = sorted(dates)
+    clusters = []
+    current_cluster = [sorted_dates[0]]
+
+    for i in range(1, len(sorted_dates)):
+        current_date = datetime.strptime(sorted_dates[i], "%Y-%m-%d")
+        prev_date = datetime.strptime(current_cluster[-1], "%Y-%m-%d")
+
+        if (current_date - prev_date).days <= max_gap:
+            current_cluster.append(sorted_dates[i])
+        else:
+            if len(current_cluster) > 1:
+                clusters.append(
+                    {
+                        "start_date": current_cluster[0],
+                        "end_date": current_cluster[-1],
+                        "dates": current_cluster,
+                        "duration": len(current_cluster),
+                    }
+                )
+            current_cluster = [sorted_dates[i]]
+
+    if len(current_cluster) > 1:
+        clusters.append(
+            {
+                "start_date": current_cluster[0],
+                "end_date": current_cluster[-1],
+                "dates": current_cluster,
+                "duration": len(current_cluster),
+            }
+        )
+
+    return clusters
+
+
+def random_dates(rng: random.Random, count: int, span_days: int) -> List[str]:
+    start = date(2020, 1, 1).toordinal()
+    return [
+        date.fromordinal(start + rng.randrange(span_days)).isoformat()
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("max_gap", [0, 1, 3, 10])
+def test_clusters_match_legacy(seed: int, max_gap: int) -> None:
+    """Ordinal clustering equals the strptime version, duplicates included."""
+    rng = random.Random(seed)
+    dates = random_dates(rng, rng.randint(0, 200), rng.choice([30, 400, 3000]))
+
+    assert cluster_dates(dates, max_gap=max_gap) == legacy_find_date_clusters(
+        dates, max_gap
+    )
+
+
+def test_min_size_and_gap() -> None:
+    """Clusters below min_size are dropped; gaps split across months."""
+    dates = ["2024-02-28", "2024-03-01", "2024-03-02", "2024-03-10", "2024-03-20"]
+
+    assert cluster_dates(dates, max_gap=2, min_size=3) == [
+        {
+            "start_date": "2024-02-28",
+            "end_date": "2024-03-02",
+            "dates": ["2024-02-28", "2024-03-01", "2024-03-02"],
+            "duration": 3,
+        }
+    ]
+    singles = cluster_dates(dates, max_gap=0, min_size=1)
+    assert [c["dates"] for c in singles] == [[d] for d in dates]
+
+
+def test_power_level_scoring() -> None:
+    """Power levels follow their dates through the sort and sum per cluster."""
+    dates = ["2024-01-12", "2024-01-02", "2024-01-10", "2024-01-01"]
+    levels = [3, 1, 2, 1]
+
+    clusters = cluster_dates(dates, power_levels=levels)
+    assert [(c["dates"], c["score"]) for c in clusters] == [
+        (["2024-01-01", "2024-01-02"], 2),
+        (["2024-01-10", "2024-01-12"], 5),
+    ]
+    strong = cluster_dates(dates, power_levels=levels, min_score=3)
+    assert [c["start_date"] for c in strong] == ["2024-01-10"]
+
+    with pytest.raises(ValueError):
+        cluster_dates(dates, power_levels=[1])
+
+
+@pytest.mark.performance
+def test_cluster_speedup() -> None:
+    """Benchmark ordinal clustering on 100k dates against strptime."""
+    rng = random.Random(0)
+    dates = random_dates(rng, 100_000, 365 * 50)
+    levels = [rng.randint(1, 3) for _ in dates]
+
+    def seconds(func: Callable[[], Any]) -> float:
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
+
+    legacy = seconds(lambda: legacy_find_date_clusters(dates))
+    ordinal = seconds(lambda: cluster_dates(dates))
+    weighted = seconds(lambda: cluster_dates(dates, power_levels=levels))
+
+    print(f"\nLegacy clustering: {legacy * 1e3:.1f}ms (100k dates)")
+    print(f"Ordinal clustering: {ordinal * 1e3:.1f}ms ({legacy/ordinal:.1f}x)")
+    print(f"Weighted clustering: {weighted * 1e3:.1f}ms")
+    assert ordinal * 5 < legacy
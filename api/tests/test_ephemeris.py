@@ -0,0 +1,70 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from api import ephemeris
+from api.ephemeris import (
+    FIRST_YEAR,
+    LAST_YEAR,
+    SIGN_ORDER,
+    TABLE_PATH,
+    build_ingress_table,
+    sign_periods,
+    sun_sign_index,
+    sun_sign_indexes,
+)
+
+
+def test_table_matches_generator() -> None:
+    """The shipped table is exactly what the offline generator produces."""
+    assert TABLE_PATH.read_bytes() == build_ingress_table()
+
+
+@pytest.mark.parametrize(
+    "year,sign,expected",
+    [
+        (1900, "Aquarius", datetime(1900, 1, 20, 11, 32)),
+        (2000, "Aries", datetime(2000, 3, 20, 7, 35)),
+        (2024, "Aries", datetime(2024, 3, 20, 3, 6)),
+        (2024, "Cancer", datetime(2024, 6, 20, 20, 51)),
+        (2024, "Capricorn", datetime(2024, 12, 21, 9, 20)),
+        (2100, "Capricorn", datetime(2100, 12, 21, 20, 0)),
+    ],
+)
+def test_ingress_instants(year: int, sign: str, expected: datetime) -> None:
+    """Ingress instants agree with published equinoxes and solstices."""
+    minutes = ephemeris._ingress_minutes()
+    entry = (year - FIRST_YEAR) * 12 + SIGN_ORDER.index(sign)
+    instant = datetime(FIRST_YEAR, 1, 1) + timedelta(minutes=minutes[entry])
+    assert abs(instant - expected) < timedelta(minutes=15)
+
+
+@pytest.mark.parametrize("year", [FIRST_YEAR, 1955, 2000, 2024, LAST_YEAR])
+def test_sign_periods_cover_year(year: int) -> None:
+    """Every day of the year is in exactly one sign period, as looked up."""
+    days = []
+    for sign in SIGN_ORDER:
+        for first, last in sign_periods(sign, year):
+            for ordinal in range(first.toordinal(), last.toordinal() + 1):
+                day = date.fromordinal(ordinal)
+                assert SIGN_ORDER[sun_sign_index(day)] == sign
+                days.append(day)
+
+    first_day = date(year, 1, 1)
+    assert sorted(days) == [
+        first_day + timedelta(days=i)
+        for i in range((date(year + 1, 1, 1) - first_day).days)
+    ]
+
+
+def test_bulk_indexes() -> None:
+    """The per-day table matches bisect lookups and marks days out of range."""
+    days = [date(1899, 12, 31), date(1900, 1, 1), date(2101, 1, 1)]
+    start = date(1990, 1, 1).toordinal()
+    days += [date.fromordinal(start + i) for i in range(3000)]
+
+    indexes = sun_sign_indexes(days)
+    assert indexes[0] == -1
+    assert indexes[2] == -1
+    assert indexes[1] == SIGN_ORDER.index("Capricorn")
+    assert indexes[3:] == [sun_sign_index(day) for day in days[3:]]
@@ -0,0 +1,180 @@
+import json
+import time
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+from api.ai_recommendations import (
+    ZODIAC_ELEMENTS,
+    calculate_power_level,
+    find_date_clusters,
+    get_enhanced_fallback_recommendations,
+    get_fallback_categories,
+    get_fallback_table,
+)
+from api.model import GoodDateResponse, to_json_compatible
+from api.numerology_kernel import parse_date
+
+
+def legacy_fallback_recommendations(
+    numerology_number: int, zodiac_sign: str, dates: List[str]
+) -> Dict[str, Any]:
+    """Per-call fallback builder the shared tables replaced, kept as the reference."""
+    if not dates:
+        return {
+            "career": [],
+            "personal": [],
+            "rest": [],
+            "financial": [],
+            "power_periods": [],
+            "date_specific_advice": {},
+        }
+    timings = {
+        "Aries": "morning",
+        "Taurus": "mid-morning",
+        "Gemini": "afternoon",
+        "Cancer": "evening",
+        "Leo": "noon",
+        "Virgo": "morning",
+        "Libra": "afternoon",
+        "Scorpio": "evening",
+        "Sagittarius": "morning",
+        "Capricorn": "early morning",
+        "Aquarius": "afternoon",
+        "Pisces": "evening",
+    }
+    element_activities = {
+        "Fire": "Take bold action and lead initiatives",
+        "Earth": "Focus on practical and material matters",
+        "Air": "Engage in communication and learning",
+        "Water": "Focus on emotional and intuitive work",
+    }
+    position_activities = {
+        "early": "Start new initiatives and plan ahead",
+        "mid": "Execute ongoing projects and maintain momentum",
+        "late": "Complete tasks and reflect on achievements",
+    }
+
+    advice: Dict[str, Dict[str, Any]] = {}
+    for date_str in sorted(dates):
+        _, _, day = parse_date(date_str)
+        position = "early" if day <= 10 else "mid" if day <= 20 else "late"
+        activities = []
+        if day % numerology_number == 0:
+            activities.append(
+                f"Excellent day for {zodiac_sign}-aligned projects "
+                "requiring focus and determination"
+            )
+        activities.append(position_activities[position])
+        activities.append(element_activities[ZODIAC_ELEMENTS.get(zodiac_sign, "Fire")])
+        advice[date_str] = {
+            "activities": activities,
+            "timing": timings.get(zodiac_sign, "morning"),
+            "power_level": calculate_power_level(date_str, numerology_number),
+            "category": ["career", "personal", "rest", "financial"][day % 4],
+        }
+
+    power_dates = [d for d, info in advice.items() if info["power_level"] > 1]
+    return {
+        "career": [
+            f"Use your Life Path {numerology_number} energy for career advancement",
+            "Focus on leadership and initiative during power periods",
+            "Schedule important meetings during high-energy dates",
+        ],
+        "personal": [
+            f"Align personal goals with {zodiac_sign}'s natural strengths",
+            "Use power dates for important personal decisions",
+            "Focus on relationships during harmonious periods",
+        ],
+        "rest": [
+            "Take advantage of natural energy dips for rejuvenation",
+            "Plan vacations during favorable date clusters",
+            "Use quiet periods for reflection and planning",
+        ],
+        "financial": [
+            "Make major financial decisions on power dates",
+            "Plan investments during auspicious periods",
+            "Review finances during clear-minded phases",
+        ],
+        "power_periods": find_date_clusters(power_dates),
+        "date_specific_advice": advice,
+    }
+
+
+def year_of_dates(year: int) -> List[str]:
+    start = date(year, 1, 1)
+    days = (date(year + 1, 1, 1) - start).days
+    return [(start + timedelta(days=i)).isoformat() for i in range(days)]
+
+
+@pytest.mark.parametrize("sign", sorted(ZODIAC_ELEMENTS) + ["Unknown"])
+@pytest.mark.parametrize("number", [1, 3, 7, 9, 11, 22, 40])
+def test_fallback_matches_legacy(sign: str, number: int) -> None:
+    """Table-driven fallbacks equal the per-call builder for a leap year."""
+    dates = year_of_dates(2024)[::3] + ["2023-12-31", "2024-02-30"]
+
+    result = get_enhanced_fallback_recommendations(number, sign, dates)
+    assert to_json_compatible(result) == legacy_fallback_recommendations(
+        number, sign, dates
+    )
+
+
+def test_fallback_payloads_are_shared_read_only() -> None:
+    """Calls share read-only activity tuples and advice instead of copying."""
+    table = get_fallback_table("Leo", 3, 2025)
+    with pytest.raises(TypeError):
+        table["2025-01-05"]["power_level"] = 9  # type: ignore[index]
+    with pytest.raises(TypeError):
+        get_fallback_categories(3, "Leo")["career"] = ()  # type: ignore[index]
+
+    dates = year_of_dates(2025)
+    first = get_enhanced_fallback_recommendations(3, "Leo", dates)
+    second = get_enhanced_fallback_recommendations(3, "Leo", dates[:40])
+    assert first["career"] is second["career"]
+    advice = first["date_specific_advice"]
+    assert advice["2025-01-05"] is second["date_specific_advice"]["2025-01-05"]
+    distinct = {id(info["activities"]) for info in advice.values()}
+    assert len(distinct) == 6
+    assert get_enhanced_fallback_recommendations(3, "Leo", []) == (
+        legacy_fallback_recommendations(3, "Leo", [])
+    )
+
+
+def test_fallback_serializes_in_responses() -> None:
+    """Responses turn the shared read-only payloads into JSON lists and objects."""
+    recommendations = get_enhanced_fallback_recommendations(3, "Leo", ["2025-01-05"])
+    response = GoodDateResponse(
+        dates=["2025-01-05"],
+        numerology_number=3,
+        number_meaning="Creativity",
+        total_matches=1,
+        recommendation_job_id=None,
+        next_offset=None,
+        zodiac_sign={"name": "Leo", "recommendations": recommendations},
+    )
+
+    data = json.loads(response.model_dump_json())["zodiac_sign"]["recommendations"]
+    assert data == legacy_fallback_recommendations(3, "Leo", ["2025-01-05"])
+
+
+@pytest.mark.performance
+def test_fallback_speedup() -> None:
+    """Benchmark table lookups against the per-call builder for a full year."""
+    dates = year_of_dates(2026)
+    get_enhanced_fallback_recommendations(5, "Virgo", dates)
+
+    def per_call_ms(func: Callable[[], Any], iterations: int = 20) -> float:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return (time.perf_counter() - start) / iterations * 1e3
+
+    legacy = per_call_ms(lambda: legacy_fallback_recommendations(5, "Virgo", dates))
+    tables = per_call_ms(
+        lambda: get_enhanced_fallback_recommendations(5, "Virgo", dates)
+    )
+
+    print(f"\nLegacy fallback: {legacy:.3f}ms/call (365 dates)")
+    print(f"Table fallback: {tables:.3f}ms/call ({legacy/tables:.1f}x)")
+    assert tables < legacy
@@ -0,0 +1,101 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+
+from api.fieldsets import paginate_dates, parse_fields, select_fields, slice_zodiac_info
+
+DATES = ["2024-01-02", "2024-01-11", "2024-01-20", "2024-02-01", "2024-02-10"]
+
+
+@pytest.mark.parametrize(
+    "fields,expected",
+    [
+        ("dates", {"dates": {}}),
+        (" dates , total_matches ,", {"dates": {}, "total_matches": {}}),
+        (
+            "zodiac_sign.name,zodiac_sign.recommendations.career",
+            {"zodiac_sign": {"name": {}, "recommendations": {"career": {}}}},
+        ),
+        ("zodiac_sign,zodiac_sign.name", {"zodiac_sign": {}}),
+        ("zodiac_sign.name,zodiac_sign", {"zodiac_sign": {}}),
+    ],
+)
+def test_parse_fields(fields: str, expected: dict) -> None:
+    """Test field selectors parse into nested specs."""
+    allowed = {"dates", "total_matches", "zodiac_sign"}
+    assert parse_fields(fields, allowed) == expected
+
+
+def test_parse_fields_unknown() -> None:
+    """Test unknown top-level fields are rejected."""
+    with pytest.raises(ValueError):
+        parse_fields("dates,secret", {"dates"})
+
+
+def test_select_fields() -> None:
+    """Test nested projection keeps only the selected parts."""
+    data = {
+        "dates": DATES,
+        "zodiac_sign": {
+            "name": "Leo",
+            "recommendations": {"career": ["a"], "rest": []},
+        },
+    }
+    spec = parse_fields("dates,zodiac_sign.recommendations.career", data)
+    assert select_fields(data, spec) == {
+        "dates": DATES,
+        "zodiac_sign": {"recommendations": {"career": ["a"]}},
+    }
+    # Selecting into a missing or non-dict value keeps what is there
+    assert select_fields({"zodiac_sign": None}, {"zodiac_sign": {"name": {}}}) == {
+        "zodiac_sign": None
+    }
+
+
+@pytest.mark.parametrize(
+    "month,offset,limit,expected",
+    [
+        (None, 0, None, (DATES, 5, None)),
+        (None, 1, 2, (DATES[1:3], 5, 3)),
+        (None, 3, 2, (DATES[3:], 5, None)),
+        (1, 0, 2, (DATES[:2], 3, 2)),
+        (1, 2, 2, (DATES[2:3], 3, None)),
+        (2, 5, None, ([], 2, None)),
+        (3, 0, 1, ([], 0, None)),
+    ],
+)
+def test_paginate_dates(
+    month: Optional[int],
+    offset: int,
+    limit: Optional[int],
+    expected: Tuple[List[str], int, Optional[int]],
+) -> None:
+    """Test month filtering and offset/limit paging."""
+    assert paginate_dates(DATES, month, offset, limit) == expected
+
+
+def test_slice_zodiac_info() -> None:
+    """Test per-date recommendations are limited to the page."""
+    zodiac_info: Dict[str, Any] = {
+        "name": "Leo",
+        "recommendations": {
+            "career": ["a"],
+            "date_specific_advice": {date: {"power_level": 1} for date in DATES},
+            "power_periods": [
+                {"start_date": "2024-01-02", "end_date": "2024-01-11"},
+                {"start_date": "2024-02-01", "end_date": "2024-02-10"},
+            ],
+        },
+    }
+    sliced = slice_zodiac_info(zodiac_info, DATES[1:3])
+
+    recommendations = sliced["recommendations"]
+    assert recommendations["career"] == ["a"]
+    assert list(recommendations["date_specific_advice"]) == DATES[1:3]
+    assert recommendations["power_periods"] == [
+        {"start_date": "2024-01-02", "end_date": "2024-01-11"}
+    ]
+    # The cached value is left untouched
+    assert len(zodiac_info["recommendations"]["date_specific_advice"]) == 5
+    assert slice_zodiac_info(zodiac_info, [])["recommendations"]["power_periods"] == []
+    assert slice_zodiac_info({"name": "Leo"}, DATES) == {"name": "Leo"}
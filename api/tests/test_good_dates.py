@@ -1,6 +1,8 @@
 import pytest
+from datetime import date, timedelta
 from typing import List
-from api.good_dates import good_dates
+from api.good_dates import calculate_numerology_dates, get_year_index, good_dates
+from api.numerology import calculate_life_path_number, get_date_compatibility
 
 
 @pytest.mark.parametrize(
@@ -54,3 +56,40 @@ def test_good_dates_invalid_input() -> None:
     """Test error handling for invalid date input."""
     with pytest.raises(ValueError):
         good_dates(2024, "invalid-date", True)
+
+
+@pytest.mark.parametrize("year", [2023, 2024])
+@pytest.mark.parametrize("match_on_single_digit", [True, False])
+@pytest.mark.parametrize("birth_date", ["1990-01-01", "2000-12-31", "1955-11-11"])
+def test_numerology_dates_match_full_scan(
+    year: int, match_on_single_digit: bool, birth_date: str
+) -> None:
+    """The year index returns exactly the days a full-year scan would find."""
+    expected = []
+    current = date(year, 1, 1)
+    while current.year == year:
+        is_compatible, _, _ = get_date_compatibility(
+            birth_date, current.isoformat(), match_on_single_digit
+        )
+        if is_compatible:
+            expected.append(current.isoformat())
+        current += timedelta(days=1)
+
+    dates, number, _ = calculate_numerology_dates(
+        birth_date, year, match_on_single_digit
+    )
+
+    assert dates == expected
+    assert number == calculate_life_path_number(birth_date, match_on_single_digit)
+
+
+def test_year_index_covers_every_day() -> None:
+    """Every day of the year lands in exactly one bucket of the index."""
+    index = get_year_index(2024, False)
+    found = [d for n in range(len(index.offsets)) for d in index.lookup(n)]
+
+    assert sorted(found) == list(index.labels)
+    assert len(found) == 366
+    assert index.lookup(-1) == []
+    assert index.lookup(1000) == []
+    assert get_year_index(2024, False) is index
@@ -1,8 +1,18 @@
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
 import pytest
 
-from api.main import app
+from api.cache import get_cached_good_dates_batch
+from api.main import app, get_good_dates_range
 from api.config import settings
+from api.model import GoodDateRangeRequest
+from api.tests.conftest import OpenAIStub
 
 
 @pytest.fixture
@@ -89,3 +99,411 @@ def test_rate_limiting(client: TestClient) -> None:
     response = client.get("/")
     assert response.status_code == 429
     assert "Retry-After" in response.headers
+
+
+def test_good_dates_batch_endpoint(client: TestClient) -> None:
+    """Test the batch endpoint keeps input order and reports item errors."""
+    items = [
+        {"birth_date": "1990-01-01", "year": 2024},
+        {"birth_date": "invalid-date", "year": 2024},
+        {"birth_date": "1999-01-01", "year": 2024},  # Same life path as item 0
+        {"birth_date": "2000-12-31", "match_on_single_digit": False, "year": 2024},
+    ]
+    response = client.post("/good-dates/batch", json={"items": items})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_errors"] == 1
+
+    results = data["results"]
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert results[1]["result"] is None
+    assert "birth_date" in results[1]["error"]
+
+    for index in (0, 2, 3):
+        assert results[index]["error"] is None
+        single = client.post("/good-dates/", json=items[index]).json()
+        assert results[index]["result"] == single
+
+    assert results[0]["result"]["dates"] == results[2]["result"]["dates"]
+
+
+def test_good_dates_batch_out_of_range_year(client: TestClient) -> None:
+    """Test an out-of-range year fails only its own batch item."""
+    items = [
+        {"birth_date": "1990-01-01", "year": 10**20},
+        {"birth_date": "1990-01-01", "year": 2024},
+    ]
+    response = client.post("/good-dates/batch", json={"items": items})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert "year" in results[0]["error"]
+    assert results[1]["result"]["total_matches"] > 0
+
+
+def test_good_dates_batch_overflow_is_item_error() -> None:
+    """Test overflowing queries reaching the cache layer fail per item."""
+    outcomes = asyncio.run(
+        get_cached_good_dates_batch(
+            [("1990-01-01", 10**20, True, False), ("1990-01-01", 2024, True, False)]
+        )
+    )
+    assert isinstance(outcomes[0], OverflowError)
+    assert not isinstance(outcomes[1], Exception)
+
+
+def test_good_dates_batch_warms_cache(client: TestClient) -> None:
+    """Test batch results land in the cache layer single requests read."""
+    from api.cache import _numerology_cache
+
+    client.post(
+        "/good-dates/batch",
+        json={"items": [{"birth_date": "1981-07-04", "year": 2031}]},
+    )
+    assert (3, 2031, True) in _numerology_cache
+
+
+def test_good_dates_range_streams_years(client: TestClient) -> None:
+    """Test the range endpoint streams one NDJSON line per year."""
+    response = client.post(
+        "/good-dates/range",
+        json={"birth_date": "1990-01-01", "year_start": 2024, "year_end": 2026},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    chunks = [json.loads(line) for line in response.text.splitlines()]
+    assert [c["year"] for c in chunks] == [2024, 2025, 2026]
+    single = client.post(
+        "/good-dates/", json={"birth_date": "1990-01-01", "year": 2025}
+    ).json()
+    assert chunks[1]["dates"] == single["dates"]
+    assert chunks[1]["total_matches"] == single["total_matches"]
+
+
+def test_good_dates_range_by_month(client: TestClient) -> None:
+    """Test monthly granularity clips the range to the requested dates."""
+    response = client.post(
+        "/good-dates/range",
+        json={
+            "birth_date": "1990-01-01",
+            "start_date": "2024-11-15",
+            "end_date": "2025-02-10",
+            "granularity": "month",
+        },
+    )
+    assert response.status_code == 200
+    chunks = [json.loads(line) for line in response.text.splitlines()]
+    assert [(c["year"], c["month"]) for c in chunks] == [
+        (2024, 11),
+        (2024, 12),
+        (2025, 1),
+        (2025, 2),
+    ]
+    dates = [d for c in chunks for d in c["dates"]]
+    assert dates and all("2024-11-15" <= d <= "2025-02-10" for d in dates)
+
+
+def test_good_dates_range_invalid(client: TestClient) -> None:
+    """Test the range endpoint rejects missing and oversized ranges."""
+    response = client.post("/good-dates/range", json={"birth_date": "1990-01-01"})
+    assert response.status_code == 422
+
+    response = client.post(
+        "/good-dates/range",
+        json={"birth_date": "1990-01-01", "year_start": 2000, "year_end": 2500},
+    )
+    assert response.status_code == 422
+
+    # Unvalidated requests without a range are rejected rather than streamed
+    request = GoodDateRangeRequest.model_construct(birth_date="1990-01-01")
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(get_good_dates_range(request, None))
+    assert excinfo.value.status_code == 400
+
+
+def test_cache_stats_by_life_path(client: TestClient) -> None:
+    """Test distinct birth dates with one life path share a numerology entry."""
+    headers = {"X-API-Key": settings.admin_api_key}
+    before = client.get("/cache/stats", headers=headers).json()["numerology"]
+
+    # All three reduce to life path 3
+    for birth_date in ("1990-01-01", "1999-01-01", "1981-01-01"):
+        client.post("/good-dates/", json={"birth_date": birth_date, "year": 2033})
+
+    after = client.get("/cache/stats", headers=headers).json()["numerology"]
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 2
+    assert 0 <= after["hit_rate"] <= 1
+
+
+def test_cache_stats_unauthorized(client: TestClient) -> None:
+    """Test cache stats endpoint requires API key."""
+    response = client.get("/cache/stats")
+    assert response.status_code == 403
+
+
+def test_ai_stats_unauthorized(client: TestClient) -> None:
+    """Test AI stats endpoint requires API key."""
+    response = client.get("/ai/stats")
+    assert response.status_code == 403
+
+
+def test_ready_after_prewarm(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test /ready goes green once startup prewarming has filled the cache."""
+    from api.cache import _numerology_cache
+
+    monkeypatch.setattr(settings, "cache_snapshot_path", "")
+
+    with TestClient(app) as client:
+        for _ in range(100):
+            if client.get("/ready").status_code == 200:
+                break
+            time.sleep(0.01)
+        response = client.get("/ready")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ready"}
+    year = datetime.now().year
+    for number in range(1, 10):
+        assert (number, year, True) in _numerology_cache
+        assert (number, year + 1, True) in _numerology_cache
+    assert (40, year, False) in _numerology_cache
+
+
+def test_deferred_recommendations(
+    monkeypatch: pytest.MonkeyPatch, openai_stub: OpenAIStub
+) -> None:
+    """Test deferred recommendations are polled, then served inline."""
+    monkeypatch.setattr(settings, "cache_snapshot_path", "")
+    request = {
+        "birth_date": "1977-07-07",
+        "year": 2033,
+        "include_zodiac": True,
+        "defer_recommendations": True,
+    }
+
+    with TestClient(app) as client:
+        response = client.post("/good-dates/", json=request)
+        assert response.status_code == 200
+        data = response.json()
+        job_id = data["recommendation_job_id"]
+        assert job_id
+        assert data["total_matches"] > 0
+        assert data["zodiac_sign"]["name"] == "Cancer"
+        assert "recommendations" not in data["zodiac_sign"]
+
+        for _ in range(100):
+            job = client.get(f"/good-dates/jobs/{job_id}").json()
+            if job["status"] == "done":
+                break
+            time.sleep(0.02)
+        assert job["status"] == "done"
+        assert job["zodiac_sign"]["recommendations"]["career"]
+
+        # The finished job filled the cache, so the next request is inline
+        data = client.post("/good-dates/", json=request).json()
+        assert data["recommendation_job_id"] is None
+        assert data["zodiac_sign"] == job["zodiac_sign"]
+
+    assert len(openai_stub.requests) == 1
+
+
+def test_deferred_recommendations_events(
+    monkeypatch: pytest.MonkeyPatch, openai_stub: OpenAIStub
+) -> None:
+    """Test a deferred recommendation job streams its result as SSE."""
+    monkeypatch.setattr(settings, "cache_snapshot_path", "")
+    openai_stub.delay = 0.2
+    request = {
+        "birth_date": "1977-07-08",
+        "year": 2033,
+        "include_zodiac": True,
+        "defer_recommendations": True,
+    }
+
+    with TestClient(app) as client:
+        job_id = client.post("/good-dates/", json=request).json()[
+            "recommendation_job_id"
+        ]
+        response = client.get(f"/good-dates/jobs/{job_id}/events")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [
+        dict(line.split(": ", 1) for line in block.splitlines())
+        for block in response.text.strip().split("\n\n")
+        if not block.startswith(":")
+    ]
+    assert [e["event"] for e in events] == ["status", "result"]
+    assert json.loads(events[0]["data"])["status"] in ("pending", "running")
+    result = json.loads(events[1]["data"])
+    assert result["status"] == "done"
+    assert result["zodiac_sign"]["recommendations"]["career"]
+
+
+def test_unknown_recommendation_job(client: TestClient) -> None:
+    """Test unknown recommendation jobs return 404."""
+    assert client.get("/good-dates/jobs/missing").status_code == 404
+    assert client.get("/good-dates/jobs/missing/events").status_code == 404
+
+
+def test_stream_recommendations_endpoint(
+    client: TestClient, openai_stub: OpenAIStub
+) -> None:
+    """Test recommendations stream as SSE ending in the good dates schema."""
+    openai_stub.content = (
+        "1. CAREER & BUSINESS\n- Launch the new venture in the morning hours\n\n"
+        "2. REST & REJUVENATION\n- Take a long weekend away from everything"
+    )
+    response = client.post(
+        "/good-dates/recommendations/stream",
+        json={"birth_date": "1977-07-09", "year": 2033},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [
+        dict(line.split(": ", 1) for line in block.splitlines())
+        for block in response.text.strip().split("\n\n")
+    ]
+    names = [e["event"] for e in events]
+    assert names[0] == "profile"
+    assert names[-1] == "result"
+    assert "token" in names
+    sections = [json.loads(e["data"]) for e in events if e["event"] == "section"]
+    assert [s["category"] for s in sections] == ["career", "rest"]
+
+    profile = json.loads(events[0]["data"])
+    result = json.loads(events[-1]["data"])
+    assert result["dates"] == profile["dates"]
+    assert result["zodiac_sign"]["name"] == "Cancer"
+    assert result["zodiac_sign"]["recommendations"]["career"] == [
+        "launch the new venture in the morning hours"
+    ]
+
+
+def test_stream_recommendations_invalid_profile(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test errors computing the profile are a 400 rather than a broken stream."""
+
+    def bad_zodiac_details(birth_date: str, year: int) -> None:
+        raise ValueError("year is out of range")
+
+    monkeypatch.setattr("api.main.get_zodiac_details", bad_zodiac_details)
+    response = client.post(
+        "/good-dates/recommendations/stream",
+        json={"birth_date": "1977-07-09", "year": 2033},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "year is out of range"
+
+
+def test_date_clusters_endpoint(client: TestClient) -> None:
+    """Test clustering client-supplied dates with power levels."""
+    response = client.post(
+        "/date-clusters",
+        json={
+            "dates": ["2024-01-05", "2024-01-01", "2024-01-03", "2024-02-01"],
+            "power_levels": [1, 2, 3, 5],
+            "max_gap": 2,
+        },
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "clusters": [
+            {
+                "start_date": "2024-01-01",
+                "end_date": "2024-01-05",
+                "dates": ["2024-01-01", "2024-01-03", "2024-01-05"],
+                "duration": 3,
+                "score": 6.0,
+            }
+        ],
+        "total_clusters": 1,
+    }
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"dates": ["2024-1-5", "2024-01-06"]},
+        {"dates": ["2024-13-01", "2024-01-06"]},
+        {"dates": ["2024-01-05"], "power_levels": [1, 2]},
+        {"dates": ["2024-01-05"], "max_gap": -1},
+    ],
+)
+def test_date_clusters_invalid_input(client: TestClient, payload: dict) -> None:
+    """Test malformed cluster requests are rejected."""
+    response = client.post("/date-clusters", json=payload)
+    assert response.status_code in (400, 422)
+
+
+def test_good_dates_fields(client: TestClient) -> None:
+    """Test fields= returns only the selected parts of the response."""
+    response = client.post(
+        "/good-dates/?fields=dates,total_matches",
+        json={"birth_date": "1990-01-01", "year": 2024},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data) == {"dates", "total_matches"}
+    assert data["total_matches"] == len(data["dates"])
+
+
+def test_good_dates_fields_skip_zodiac(
+    client: TestClient, openai_stub: OpenAIStub
+) -> None:
+    """Test zodiac recommendations are not computed unless selected."""
+    response = client.post(
+        "/good-dates/?fields=dates",
+        json={"birth_date": "1977-07-10", "year": 2033, "include_zodiac": True},
+    )
+    assert response.status_code == 200
+    assert list(response.json()) == ["dates"]
+    assert openai_stub.requests == []
+
+    response = client.post(
+        "/good-dates/?fields=zodiac_sign.name",
+        json={"birth_date": "1977-07-10", "year": 2033, "include_zodiac": True},
+    )
+    assert response.json() == {"zodiac_sign": {"name": "Cancer"}}
+
+
+def test_good_dates_unknown_field(client: TestClient) -> None:
+    """Test unknown fields are rejected."""
+    response = client.post(
+        "/good-dates/?fields=dates,password",
+        json={"birth_date": "1990-01-01", "year": 2024},
+    )
+    assert response.status_code == 400
+
+
+def test_good_dates_month_pages(client: TestClient) -> None:
+    """Test month/offset pages are slices of the full result."""
+    request = {"birth_date": "1990-01-01", "year": 2024}
+    everything = client.post("/good-dates/", json=request).json()
+    march = [date for date in everything["dates"] if date.startswith("2024-03-")]
+    assert len(march) > 1
+
+    pages = []
+    offset: Optional[int] = 0
+    while offset is not None:
+        data = client.post(
+            f"/good-dates/?month=3&limit=1&offset={offset}", json=request
+        ).json()
+        assert data["total_matches"] == len(march)
+        pages.extend(data["dates"])
+        offset = data["next_offset"]
+    assert pages == march
+    assert everything["next_offset"] is None
+
+
+@pytest.mark.parametrize("query", ["month=13", "month=0", "offset=-1", "limit=0"])
+def test_good_dates_invalid_page(client: TestClient, query: str) -> None:
+    """Test out-of-range paging parameters are rejected."""
+    response = client.post(
+        f"/good-dates/?{query}", json={"birth_date": "1990-01-01", "year": 2024}
+    )
+    assert response.status_code == 422
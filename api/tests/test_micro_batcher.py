@@ -0,0 +1,118 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from api.micro_batcher import MicroBatcher
+
+
+class Upstream:
+    """Batch function recording every batch it is called with."""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.batches: List[List[str]] = []
+        self.fail = fail
+
+    async def __call__(self, requests: List[str]) -> List[str]:
+        self.batches.append(requests)
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return [request.upper() for request in requests]
+
+
+def test_concurrent_requests_share_a_batch() -> None:
+    """Requests inside the window go out together; duplicates share results."""
+    upstream = Upstream()
+    batcher = MicroBatcher(upstream, window=0.02, max_size=10)
+
+    async def main() -> List[str]:
+        return await asyncio.gather(
+            *(batcher.submit(request, request) for request in "abcab")
+        )
+
+    assert asyncio.run(main()) == ["A", "B", "C", "A", "B"]
+    assert upstream.batches == [["a", "b", "c"]]
+    assert batcher.stats()["deduplicated"] == 2
+    assert batcher.stats()["average_batch_size"] == 3
+
+
+def test_batches_split_by_size_and_group() -> None:
+    """Full batches go out at once and groups never share a batch."""
+    upstream = Upstream()
+    batcher = MicroBatcher(
+        upstream, window=0.02, max_size=2, group=lambda request: request.isdigit()
+    )
+
+    async def main() -> List[str]:
+        return await asyncio.gather(
+            *(batcher.submit(request, request) for request in "ab1c2")
+        )
+
+    assert asyncio.run(main()) == ["A", "B", "1", "C", "2"]
+    assert sorted(upstream.batches) == [["1", "2"], ["a", "b"], ["c"]]
+
+
+def test_duplicates_join_an_inflight_batch() -> None:
+    """A duplicate arriving while its batch runs reuses that batch's result."""
+    upstream = Upstream()
+    batcher = MicroBatcher(upstream, window=0.001, max_size=10)
+
+    async def main() -> List[str]:
+        first = asyncio.ensure_future(batcher.submit("a", "a"))
+        await asyncio.sleep(0.005)
+        second = await batcher.submit("a", "a")
+        return [await first, second]
+
+    assert asyncio.run(main()) == ["A", "A"]
+    assert upstream.batches == [["a"]]
+
+
+def test_batch_failure_reaches_every_waiter() -> None:
+    """An upstream error is raised to all waiters and the next call retries."""
+    upstream = Upstream(fail=True)
+    batcher = MicroBatcher(upstream, window=0.001, max_size=10)
+
+    async def main() -> None:
+        results = await asyncio.gather(
+            batcher.submit("a", "a"), batcher.submit("b", "b"), return_exceptions=True
+        )
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+        upstream.fail = False
+        assert await batcher.submit("a", "a") == "A"
+
+    asyncio.run(main())
+    assert len(upstream.batches) == 2
+
+
+def test_cancelled_waiter_keeps_shared_result() -> None:
+    """A waiter timing out does not cancel the result for its duplicates."""
+    upstream = Upstream()
+    batcher = MicroBatcher(upstream, window=0.001, max_size=10)
+
+    async def main() -> str:
+        impatient = batcher.submit("a", "a")
+        patient = asyncio.ensure_future(batcher.submit("a", "a"))
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(impatient, timeout=0.002)
+        return await patient
+
+    assert asyncio.run(main()) == "A"
+
+
+def test_short_batch_result_fails_every_waiter() -> None:
+    """A batch returning fewer results than requests fails instead of hanging."""
+
+    async def short_upstream(requests: List[str]) -> List[str]:
+        return [request.upper() for request in requests[:-1]]
+
+    batcher = MicroBatcher(short_upstream, window=0.001, max_size=10)
+
+    async def main() -> None:
+        results = await asyncio.gather(
+            batcher.submit("a", "a"), batcher.submit("b", "b"), return_exceptions=True
+        )
+        assert all(isinstance(result, ValueError) for result in results)
+
+    asyncio.run(main())
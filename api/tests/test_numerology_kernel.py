@@ -0,0 +1,95 @@
+import time
+from datetime import date, timedelta
+from typing import Callable, Iterator
+
+import pytest
+
+from api.ai_recommendations import calculate_power_level
+from api.numerology import calculate_life_path_number
+from api.numerology_kernel import date_number, digit_sum, digital_root, parse_date
+
+
+def legacy_life_path_number(birth_date: str, single_digit: bool = True) -> int:
+    """String-based implementation the kernel replaced, kept as the reference."""
+    total = sum(int(n) for n in birth_date.replace("-", ""))
+    if single_digit and total > 9:
+        while total > 9:
+            total = sum(int(d) for d in str(total))
+    return total
+
+
+def legacy_power_level(date_str: str, numerology_number: int) -> int:
+    """String-based power level the kernel replaced, kept as the reference."""
+    day = int(date_str.split("-")[2])
+    month = int(date_str.split("-")[1])
+    number = sum(int(d) for d in str(day + month))
+    while number > 9:
+        number = sum(int(d) for d in str(number))
+    return 1 + (number == numerology_number) + (day == numerology_number)
+
+
+def all_dates(start: date, end: date) -> Iterator[date]:
+    """Yield every date from start to end inclusive."""
+    current = start
+    while current <= end:
+        yield current
+        current += timedelta(days=1)
+
+
+@pytest.mark.parametrize("single_digit", [True, False])
+def test_kernel_matches_legacy_for_every_date(single_digit: bool) -> None:
+    """Kernel and string implementation agree for every date 1900-2100."""
+    for current in all_dates(date(1900, 1, 1), date(2100, 12, 31)):
+        iso = current.isoformat()
+        expected = legacy_life_path_number(iso, single_digit)
+        assert date_number(current.year, current.month, current.day, single_digit) == (
+            expected
+        ), iso
+        assert calculate_life_path_number(iso, single_digit) == expected, iso
+
+
+def test_power_level_matches_legacy() -> None:
+    """Power levels agree for every month/day pair and life path number."""
+    for current in all_dates(date(2024, 1, 1), date(2024, 12, 31)):
+        iso = current.isoformat()
+        for number in range(1, 10):
+            assert calculate_power_level(iso, number) == legacy_power_level(
+                iso, number
+            ), (iso, number)
+
+
+@pytest.mark.parametrize(
+    "number,expected_sum,expected_root",
+    [(0, 0, 0), (9, 9, 9), (10, 1, 1), (1990, 19, 1), (123456789, 45, 9)],
+)
+def test_digit_helpers(number: int, expected_sum: int, expected_root: int) -> None:
+    """Digit sums and digital roots of representative integers."""
+    assert digit_sum(number) == expected_sum
+    assert digital_root(number) == expected_root
+
+
+def test_parse_date_rejects_malformed_input() -> None:
+    """Malformed dates raise ValueError like the string implementation did."""
+    assert parse_date("1990-01-01") == (1990, 1, 1)
+    with pytest.raises(ValueError):
+        parse_date("invalid-date")
+
+
+@pytest.mark.performance
+def test_kernel_speedup() -> None:
+    """Microbenchmark the integer kernel against the string implementation."""
+
+    def per_call_us(func: Callable[[], int], iterations: int = 20000) -> float:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return (time.perf_counter() - start) / iterations * 1e6
+
+    legacy = per_call_us(lambda: legacy_life_path_number("1990-12-29", True))
+    parsed = per_call_us(lambda: calculate_life_path_number("1990-12-29", True))
+    kernel = per_call_us(lambda: date_number(1990, 12, 29, True))
+
+    print(f"\nLegacy string digit sum: {legacy:.3f}us/call")
+    print(f"Kernel from ISO string: {parsed:.3f}us/call ({legacy/parsed:.1f}x)")
+    print(f"Kernel from integers: {kernel:.3f}us/call ({legacy/kernel:.1f}x)")
+    assert kernel < legacy
@@ -0,0 +1,166 @@
+import time
+from collections import ChainMap
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+from api.good_dates import get_zodiac_details
+from api.zodiac import ZODIAC_SIGNS, classify_zodiac_signs, get_zodiac_sign
+
+# (first month, first day, last month, last day, sign info) in old branch order
+LEGACY_SIGNS = [
+    (3, 21, 4, 19, "Aries", "♈", "Fire", "March 21 - April 19"),
+    (4, 20, 5, 20, "Taurus", "♉", "Earth", "April 20 - May 20"),
+    (5, 21, 6, 20, "Gemini", "♊", "Air", "May 21 - June 20"),
+    (6, 21, 7, 22, "Cancer", "♋", "Water", "June 21 - July 22"),
+    (7, 23, 8, 22, "Leo", "♌", "Fire", "July 23 - August 22"),
+    (8, 23, 9, 22, "Virgo", "♍", "Earth", "August 23 - September 22"),
+    (9, 23, 10, 22, "Libra", "♎", "Air", "September 23 - October 22"),
+    (10, 23, 11, 21, "Scorpio", "♏", "Water", "October 23 - November 21"),
+    (11, 22, 12, 21, "Sagittarius", "♐", "Fire", "November 22 - December 21"),
+    (12, 22, 1, 19, "Capricorn", "♑", "Earth", "December 22 - January 19"),
+    (1, 20, 2, 18, "Aquarius", "♒", "Air", "January 20 - February 18"),
+]
+
+
+def legacy_get_zodiac_sign(birth_date: str) -> Dict[str, Any]:
+    """strptime and if/elif lookup the boundary table replaced, kept as reference."""
+    parsed = datetime.strptime(birth_date, "%Y-%m-%d")
+    month, day = parsed.month, parsed.day
+    keys = ["name", "symbol", "element", "date_range"]
+    for first_month, first_day, last_month, last_day, *info in LEGACY_SIGNS:
+        if (month == first_month and day >= first_day) or (
+            month == last_month and day <= last_day
+        ):
+            return dict(zip(keys, info, strict=True))
+    return dict(
+        zip(keys, ["Pisces", "♓", "Water", "February 19 - March 20"], strict=True)
+    )
+
+
+def year_dates(year: int = 2024) -> List[str]:
+    start = date(year, 1, 1)
+    days = (date(year + 1, 1, 1) - start).days
+    return [(start + timedelta(days=i)).isoformat() for i in range(days)]
+
+
+# Traditional first day of each sign, as (month, day)
+LEGACY_STARTS = [
+    (first_month, first_day) for first_month, first_day, *_ in LEGACY_SIGNS
+]
+LEGACY_STARTS.append((2, 19))
+
+
+@pytest.mark.parametrize("year", [1896, 2104])
+def test_signs_match_legacy_outside_table(year: int) -> None:
+    """Outside the ingress table every birthday keeps its traditional sign."""
+    dates = year_dates(year)
+    for birth_date in dates:
+        assert get_zodiac_sign(birth_date) == legacy_get_zodiac_sign(birth_date)
+    assert classify_zodiac_signs(dates) == [get_zodiac_sign(d) for d in dates]
+
+
+@pytest.mark.parametrize("year", [1900, 1955, 1990, 2024, 2100])
+def test_signs_differ_from_legacy_only_on_cusps(year: int) -> None:
+    """Inside the table only days next to a traditional boundary can change."""
+    dates = year_dates(year)
+    for birth_date in dates:
+        name = get_zodiac_sign(birth_date)["name"]
+        if name != legacy_get_zodiac_sign(birth_date)["name"]:
+            day = date.fromisoformat(birth_date)
+            assert any(
+                abs((day - date(year, month, first)).days) <= 1
+                for month, first in LEGACY_STARTS
+            ), birth_date
+    assert classify_zodiac_signs(dates) == [get_zodiac_sign(d) for d in dates]
+
+
+@pytest.mark.parametrize(
+    "birth_date,name",
+    [
+        ("2024-03-20", "Aries"),  # Equinox at 03:06 UTC
+        ("2024-12-21", "Capricorn"),  # Solstice at 09:20 UTC
+        ("2016-07-22", "Leo"),  # Ingress at 09:30 UTC
+        ("2023-12-21", "Sagittarius"),  # Solstice at 03:27 UTC on the 22nd
+        ("1900-01-01", "Capricorn"),
+        ("2100-12-31", "Capricorn"),
+    ],
+)
+def test_cusp_birthdays(birth_date: str, name: str) -> None:
+    """Cusp birthdays follow the Sun's actual ingress rather than fixed dates."""
+    assert get_zodiac_sign(birth_date)["name"] == name
+    assert classify_zodiac_signs([birth_date])[0]["name"] == name
+
+
+@pytest.mark.parametrize(
+    "birth_date,date_range",
+    [
+        ("1996-03-20", "March 20 - April 19"),  # Equinox at 08:03 UTC
+        ("1990-07-30", "July 23 - August 22"),
+        ("1990-01-10", "December 22 - January 19"),  # Period started in 1989
+        ("1990-12-25", "December 22 - January 20"),
+        ("1850-03-20", "February 19 - March 20"),  # Outside the table
+    ],
+)
+def test_date_range_follows_ingress(birth_date: str, date_range: str) -> None:
+    """The date range is the period in the sign around the birthday."""
+    sign = get_zodiac_sign(birth_date)
+    assert sign["date_range"] == date_range
+    assert classify_zodiac_signs([birth_date]) == [sign]
+
+
+def test_sign_records_are_shared_and_read_only() -> None:
+    """Lookups return the same frozen record rather than fresh dicts."""
+    sign = get_zodiac_sign("1990-07-30")
+    assert sign is get_zodiac_sign("2010-08-01")
+    assert sign in ZODIAC_SIGNS
+    assert len(ZODIAC_SIGNS) == 12
+    with pytest.raises(TypeError):
+        sign["name"] = "Virgo"  # type: ignore[index]
+
+
+def test_zodiac_details_overlay() -> None:
+    """Per-request fields go into an overlay that leaves the record untouched."""
+    details = get_zodiac_details("1990-07-30", 2024)
+    assert isinstance(details, ChainMap)
+    assert details["name"] == "Leo"
+    assert details["favorable_dates"][0] == "2024-07-22"
+    assert details["favorable_dates"][-1] == "2024-08-22"
+    assert {
+        sign["name"] for sign in classify_zodiac_signs(details["favorable_dates"])
+    } == {"Leo"}
+
+    details["recommendations"] = {"career": []}
+    assert "recommendations" not in get_zodiac_sign("1990-07-30")
+    assert "favorable_dates" not in get_zodiac_sign("1990-07-30")
+
+
+@pytest.mark.parametrize("birth_date", ["1990-02-30", "1990-13-01", "not-a-date"])
+def test_invalid_birth_dates(birth_date: str) -> None:
+    """Impossible dates are rejected as before."""
+    with pytest.raises(ValueError):
+        get_zodiac_sign(birth_date)
+    with pytest.raises(ValueError):
+        classify_zodiac_signs(["1990-01-01", birth_date])
+
+
+@pytest.mark.performance
+def test_zodiac_lookup_speedup() -> None:
+    """Benchmark table lookups on 20k birth dates against the branch chain."""
+    dates = year_dates() * 55
+
+    def seconds(func: Callable[[], Any]) -> float:
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
+
+    legacy = seconds(lambda: [legacy_get_zodiac_sign(d) for d in dates])
+    table = seconds(lambda: [get_zodiac_sign(d) for d in dates])
+    batch = seconds(lambda: classify_zodiac_signs(dates))
+
+    print(f"\nLegacy zodiac lookup: {legacy * 1e3:.1f}ms (20k dates)")
+    print(f"Table lookup: {table * 1e3:.1f}ms ({legacy/table:.1f}x)")
+    print(f"Batch lookup: {batch * 1e3:.1f}ms ({legacy/batch:.1f}x)")
+    assert table * 3 < legacy
+    assert batch < table
@@ -1,95 +1,151 @@
-from datetime import datetime
-from typing import Dict, Any
-
-
-def get_zodiac_sign(birth_date: str) -> Dict[str, Any]:
-    """Calculate zodiac sign and its characteristics from birth date."""
-    date = datetime.strptime(birth_date, "%Y-%m-%d")
-    month = date.month
-    day = date.day
-
-    # Basic zodiac sign data - recommendations will come from AI
-    if (month == 3 and day >= 21) or (month == 4 and day <= 19):
-        return {
-            "name": "Aries",
-            "symbol": "♈",
-            "element": "Fire",
-            "date_range": "March 21 - April 19",
-        }
-    elif (month == 4 and day >= 20) or (month == 5 and day <= 20):
-        return {
-            "name": "Taurus",
-            "symbol": "♉",
-            "element": "Earth",
-            "date_range": "April 20 - May 20",
-        }
-    elif (month == 5 and day >= 21) or (month == 6 and day <= 20):
-        return {
-            "name": "Gemini",
-            "symbol": "♊",
-            "element": "Air",
-            "date_range": "May 21 - June 20",
-        }
-    elif (month == 6 and day >= 21) or (month == 7 and day <= 22):
-        return {
-            "name": "Cancer",
-            "symbol": "♋",
-            "element": "Water",
-            "date_range": "June 21 - July 22",
-        }
-    elif (month == 7 and day >= 23) or (month == 8 and day <= 22):
-        return {
-            "name": "Leo",
-            "symbol": "♌",
-            "element": "Fire",
-            "date_range": "July 23 - August 22",
-        }
-    elif (month == 8 and day >= 23) or (month == 9 and day <= 22):
-        return {
-            "name": "Virgo",
-            "symbol": "♍",
-            "element": "Earth",
-            "date_range": "August 23 - September 22",
-        }
-    elif (month == 9 and day >= 23) or (month == 10 and day <= 22):
-        return {
-            "name": "Libra",
-            "symbol": "♎",
-            "element": "Air",
-            "date_range": "September 23 - October 22",
-        }
-    elif (month == 10 and day >= 23) or (month == 11 and day <= 21):
-        return {
-            "name": "Scorpio",
-            "symbol": "♏",
-            "element": "Water",
-            "date_range": "October 23 - November 21",
-        }
-    elif (month == 11 and day >= 22) or (month == 12 and day <= 21):
-        return {
-            "name": "Sagittarius",
-            "symbol": "♐",
-            "element": "Fire",
-            "date_range": "November 22 - December 21",
-        }
-    elif (month == 12 and day >= 22) or (month == 1 and day <= 19):
-        return {
-            "name": "Capricorn",
-            "symbol": "♑",
-            "element": "Earth",
-            "date_range": "December 22 - January 19",
-        }
-    elif (month == 1 and day >= 20) or (month == 2 and day <= 18):
-        return {
-            "name": "Aquarius",
-            "symbol": "♒",
-            "element": "Air",
-            "date_range": "January 20 - February 18",
-        }
-    else:  # Pisces (February 19 - March 20)
-        return {
-            "name": "Pisces",
-            "symbol": "♓",
-            "element": "Water",
-            "date_range": "February 19 - March 20",
-        }
+from bisect import bisect_right
+from datetime import date, timedelta
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
+
+from api.ephemeris import (
+    FIRST_YEAR,
+    LAST_YEAR,
+    SIGN_ORDER,
+    sign_periods,
+    sun_sign_index,
+    sun_sign_indexes,
+)
+
+# Days before each month in a leap year, so every birthday has one slot
+_DAYS_BEFORE_MONTH = (0, 0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335)
+
+
+def _day_of_year(month: int, day: int) -> int:
+    return _DAYS_BEFORE_MONTH[month] + day
+
+
+def _sign(name: str, symbol: str, element: str, date_range: str) -> Mapping[str, Any]:
+    return MappingProxyType(
+        {"name": name, "symbol": symbol, "element": element, "date_range": date_range}
+    )
+
+
+# Basic zodiac sign data, shared read-only - recommendations will come from AI
+_CAPRICORN = _sign("Capricorn", "♑", "Earth", "December 22 - January 19")
+
+# Traditional first month and day of each sign, in calendar order; Capricorn
+# spans the new year
+_SIGN_STARTS: Tuple[Tuple[int, int, Mapping[str, Any]], ...] = (
+    (1, 1, _CAPRICORN),
+    (1, 20, _sign("Aquarius", "♒", "Air", "January 20 - February 18")),
+    (2, 19, _sign("Pisces", "♓", "Water", "February 19 - March 20")),
+    (3, 21, _sign("Aries", "♈", "Fire", "March 21 - April 19")),
+    (4, 20, _sign("Taurus", "♉", "Earth", "April 20 - May 20")),
+    (5, 21, _sign("Gemini", "♊", "Air", "May 21 - June 20")),
+    (6, 21, _sign("Cancer", "♋", "Water", "June 21 - July 22")),
+    (7, 23, _sign("Leo", "♌", "Fire", "July 23 - August 22")),
+    (8, 23, _sign("Virgo", "♍", "Earth", "August 23 - September 22")),
+    (9, 23, _sign("Libra", "♎", "Air", "September 23 - October 22")),
+    (10, 23, _sign("Scorpio", "♏", "Water", "October 23 - November 21")),
+    (11, 22, _sign("Sagittarius", "♐", "Fire", "November 22 - December 21")),
+    (12, 22, _CAPRICORN),
+)
+ZODIAC_SIGNS: Tuple[Mapping[str, Any], ...] = tuple(
+    sign for _, _, sign in _SIGN_STARTS[1:]
+)
+_BOUNDARIES = [_day_of_year(month, day) for month, day, _ in _SIGN_STARTS]
+_SIGNS = [sign for _, _, sign in _SIGN_STARTS]
+
+# Sign for every day of year, so bulk classification skips the search
+_SIGN_BY_DAY = [_CAPRICORN] + [
+    _SIGNS[bisect_right(_BOUNDARIES, day) - 1] for day in range(1, 367)
+]
+
+_SIGNS_BY_NAME: Dict[str, Mapping[str, Any]] = {
+    sign["name"]: sign for sign in ZODIAC_SIGNS
+}
+# Sign records by ephemeris sign index
+_EPHEMERIS_SIGNS = tuple(_SIGNS_BY_NAME[name] for name in SIGN_ORDER)
+_CAPRICORN_INDEX = SIGN_ORDER.index("Capricorn")
+
+# Records by (name, date range), so years whose ingress dates match the
+# traditional ranges share the traditional record
+_RECORDS_BY_RANGE: Dict[Tuple[str, str], Mapping[str, Any]] = {
+    (sign["name"], sign["date_range"]): sign for sign in ZODIAC_SIGNS
+}
+
+
+def _range_text(start: date, end: date) -> str:
+    return f"{start:%B} {start.day} - {end:%B} {end.day}"
+
+
+@lru_cache(maxsize=None)
+def _ephemeris_sign(year: int, index: int) -> Mapping[str, Any]:
+    """Get the record for the period in a sign that starts in ``year``.
+
+    The date range comes from the Sun ingress table. Capricorn periods run
+    into the next year; at the ends of the table the missing side is taken
+    from the same year, so it may be a day off.
+    """
+    sign = _EPHEMERIS_SIGNS[index]
+    name = sign["name"]
+    if index == _CAPRICORN_INDEX:
+        start = sign_periods(name, max(year, FIRST_YEAR))[-1][0]
+        end = sign_periods(name, min(year + 1, LAST_YEAR))[0][1]
+    else:
+        start, end = sign_periods(name, year)[0]
+    key = (name, _range_text(start, end))
+    if key not in _RECORDS_BY_RANGE:
+        _RECORDS_BY_RANGE[key] = _sign(name, sign["symbol"], sign["element"], key[1])
+    return _RECORDS_BY_RANGE[key]
+
+
+def _ingress_sign(day: date, index: int) -> Mapping[str, Any]:
+    # January Capricorn birthdays belong to the period starting the year before
+    if index == _CAPRICORN_INDEX and day.month == 1:
+        return _ephemeris_sign(day.year - 1, index)
+    return _ephemeris_sign(day.year, index)
+
+
+def get_zodiac_sign(birth_date: str) -> Mapping[str, Any]:
+    """Get the zodiac sign and its characteristics for a birth date.
+
+    For 1900-2100 the precomputed Sun ingress table decides cusp birthdays,
+    and ``date_range`` gives the Sun's actual period in the sign around the
+    birthday; other years use the traditional date ranges. The returned record
+    is shared and read-only; layer per-request data over it, e.g. with a
+    ``ChainMap``, instead of copying it.
+    """
+    parsed = date.fromisoformat(birth_date)
+    if FIRST_YEAR <= parsed.year <= LAST_YEAR:
+        return _ingress_sign(parsed, sun_sign_index(parsed))
+    day = _day_of_year(parsed.month, parsed.day)
+    return _SIGNS[bisect_right(_BOUNDARIES, day) - 1]
+
+
+def classify_zodiac_signs(birth_dates: Iterable[str]) -> List[Mapping[str, Any]]:
+    """Get the zodiac sign records for many birth dates in one call."""
+    days = [date.fromisoformat(birth_date) for birth_date in birth_dates]
+    return [
+        (
+            _ingress_sign(day, index)
+            if index >= 0
+            else _SIGN_BY_DAY[_day_of_year(day.month, day.day)]
+        )
+        for day, index in zip(days, sun_sign_indexes(days), strict=True)
+    ]
+
+
+def get_sign_periods(sign: str, year: int) -> List[Tuple[date, date]]:
+    """Get the first and last days of each period of a year in a zodiac sign.
+
+    Uses the same rules as :func:`get_zodiac_sign`; Capricorn has a period at
+    each end of the year.
+    """
+    if FIRST_YEAR <= year <= LAST_YEAR:
+        return sign_periods(sign, year)
+
+    starts = [date(year, month, day) for month, day, _ in _SIGN_STARTS]
+    ends = [start - timedelta(days=1) for start in starts[1:]] + [date(year, 12, 31)]
+    return [
+        (start, end)
+        for (_, _, record), start, end in zip(_SIGN_STARTS, starts, ends, strict=True)
+        if record["name"] == sign
+    ]
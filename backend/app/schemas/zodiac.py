@@ -1,6 +1,9 @@
 from typing import Dict, Any, List
 from pydantic import BaseModel
 
+# Advice keyed by ISO date
+DateSpecificAdvice = Dict[str, Dict[str, Any]]
+
 
 class PowerPeriod(BaseModel):
     start_date: str
@@ -15,7 +18,7 @@ class ZodiacRecommendations(BaseModel):
     rest: List[str]
     financial: List[str]
     power_periods: List[PowerPeriod]
-    date_specific_advice: Dict[str, Dict[str, Any]]
+    date_specific_advice: DateSpecificAdvice
 
 
 class ZodiacSign(BaseModel):
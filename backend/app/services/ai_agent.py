@@ -1,67 +1,135 @@
-from typing import Dict, Any
-from openai import AsyncOpenAI
+import asyncio
+from typing import Any, Dict, List
+
+from openai import APIError, AsyncOpenAI
+from pydantic import TypeAdapter
+
 from ..core.config import settings
+from ..schemas.zodiac import DateSpecificAdvice
 
 client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
 
+# Most LLM requests this process has in flight at once
+MAX_CONCURRENT_REQUESTS = 4
+_request_slots = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+# Date analysis is split so each reply stays well under the output limit:
+# roughly TOKENS_PER_DATE of advice per date, CHUNK_TOKEN_BUDGET per chunk
+TOKENS_PER_DATE = 120
+CHUNK_TOKEN_BUDGET = 3000
+CHUNK_ATTEMPTS = 3
+CHUNK_RETRY_DELAY = 0.5
+
+PROMPTS = {
+    "date_recommendations": """
+    For someone with Life Path Number {numerology_number} and zodiac sign 
+    {zodiac_sign} ({element}), analyze these dates: {dates}.
+    
+    For each date, provide:
+    1. The most auspicious category (career/personal/rest/financial)
+    2. Optimal timing for activities
+    3. Power level (1-3)
+    4. Specific, personalized activities based on their zodiac and 
+        numerology
+    
+    Consider astrological aspects, numerological significance, and element 
+    compatibility.
+    Format as a JSON with date-keyed recommendations.
+    """,
+    "power_periods": """
+    Analyze these dates: {dates}
+    For someone with {zodiac_element} element and Life Path 
+    {numerology_number},
+    identify powerful date clusters where energy alignment is strongest.
+    
+    Consider:
+    - Elemental compatibility
+    - Numerological resonance
+    - Astrological aspects
+    
+    Format as a JSON array of power periods with start_date, end_date, dates, and duration.
+    """,
+}
+
+
+_date_advice = TypeAdapter(DateSpecificAdvice)
+
+
+async def _complete(prompt: str) -> str:
+    async with _request_slots:
+        response = await client.chat.completions.create(
+            model="gpt-4-turbo-preview",
+            messages=[
+                {
+                    "role": "system",
+                    "content": (
+                        "You are an expert astrologer and numerologist "
+                        "specializing in personalized date recommendations."
+                    ),
+                },
+                {"role": "user", "content": prompt},
+            ],
+            response_format={"type": "json_object"},
+        )
+
+    return response.choices[0].message.content or ""
+
 
 async def get_personalized_recommendations(
     recommendation_type: str, context: Dict[str, Any]
-) -> Dict[str, Any]:
-    """Get personalized recommendations using AI."""
-
-    prompts = {
-        "zodiac_sign": """
-        Based on the birth date {birth_date}, provide detailed zodiac sign 
-        information. Include specific personality traits, strengths, and areas 
-        for growth. Format the response as a JSON with name, symbol, element, 
-        and date_range.
-        """,
-        "date_recommendations": """
-        For someone with Life Path Number {numerology_number} and zodiac sign 
-        {zodiac_sign} ({element}), analyze these dates: {dates}.
-        
-        For each date, provide:
-        1. The most auspicious category (career/personal/rest/financial)
-        2. Optimal timing for activities
-        3. Power level (1-3)
-        4. Specific, personalized activities based on their zodiac and 
-            numerology
-        
-        Consider astrological aspects, numerological significance, and element 
-        compatibility.
-        Format as a JSON with date-keyed recommendations.
-        """,
-        "power_periods": """
-        Analyze these dates: {dates}
-        For someone with {zodiac_element} element and Life Path 
-        {numerology_number},
-        identify powerful date clusters where energy alignment is strongest.
-        
-        Consider:
-        - Elemental compatibility
-        - Numerological resonance
-        - Astrological aspects
-        
-        Format as a JSON array of power periods with start_date, end_date, dates, and duration.
-        """,
-    }
-
-    prompt = prompts[recommendation_type].format(**context)
-
-    response = await client.chat.completions.create(
-        model="gpt-4-turbo-preview",
-        messages=[
-            {
-                "role": "system",
-                "content": (
-                    "You are an expert astrologer and numerologist "
-                    "specializing in personalized date recommendations."
-                ),
-            },
-            {"role": "user", "content": prompt},
-        ],
-        response_format={"type": "json_object"},
-    )
-
-    return response.choices[0].message.content
+) -> str:
+    """Get personalized recommendations using AI, as a JSON string."""
+    return await _complete(PROMPTS[recommendation_type].format(**context))
+
+
+def chunk_dates(
+    dates: List[str], token_budget: int = CHUNK_TOKEN_BUDGET
+) -> List[List[str]]:
+    """Split dates into chunks whose advice should fit in ``token_budget`` tokens."""
+    size = max(1, token_budget // TOKENS_PER_DATE)
+    return [dates[i : i + size] for i in range(0, len(dates), size)]
+
+
+def _parse_date_advice(content: str, dates: List[str]) -> DateSpecificAdvice:
+    """Validate a chunk's JSON reply, raising ValueError if any date is missing."""
+    advice = _date_advice.validate_json(content)
+    missing = [date for date in dates if date not in advice]
+    if missing:
+        raise ValueError(f"No advice for {', '.join(missing)}")
+    return {date: advice[date] for date in dates}
+
+
+async def _analyze_chunk(
+    dates: List[str], context: Dict[str, Any]
+) -> DateSpecificAdvice:
+    prompt = PROMPTS["date_recommendations"].format(dates=dates, **context)
+    for attempt in range(CHUNK_ATTEMPTS - 1):
+        try:
+            return _parse_date_advice(await _complete(prompt), dates)
+        except (APIError, ValueError):
+            await asyncio.sleep(CHUNK_RETRY_DELAY * 2**attempt)
+    return _parse_date_advice(await _complete(prompt), dates)
+
+
+async def get_date_advice(
+    dates: List[str], context: Dict[str, Any]
+) -> DateSpecificAdvice:
+    """Get advice for each date, analyzing chunks of dates concurrently.
+
+    ``context`` fills the rest of the date_recommendations prompt. A chunk
+    that fails or returns invalid advice is retried on its own; if it keeps
+    failing, the other chunks are cancelled.
+    """
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(_analyze_chunk(chunk, context))
+                for chunk in chunk_dates(dates)
+            ]
+    except ExceptionGroup as e:
+        raise e.exceptions[0] from e
+
+    advice: DateSpecificAdvice = {}
+    for task in tasks:
+        advice.update(task.result())
+    return advice
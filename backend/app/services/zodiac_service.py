@@ -1,36 +1,35 @@
-from typing import Dict, Any
+import asyncio
 import json
-from ..schemas.zodiac import GoodDateResponse, ZodiacSign, DateAdvice, PowerPeriod
-from datetime import datetime
-from ..services.ai_agent import get_personalized_recommendations
+from typing import Any, Dict
 
+from api.zodiac import get_zodiac_sign as classify_zodiac_sign
 
-async def get_zodiac_sign(birth_date: str) -> Dict[str, Any]:
-    """Get zodiac sign information based on birth date."""
-    # Get zodiac sign details using birth date
-    zodiac_details = await get_personalized_recommendations(
-        "zodiac_sign", {"birth_date": birth_date}
-    )
-    return zodiac_details
+from ..schemas.zodiac import DateSpecificAdvice, GoodDateResponse, ZodiacSign
+from ..services.ai_agent import get_date_advice, get_personalized_recommendations
+
+
+def get_zodiac_sign(birth_date: str) -> Dict[str, Any]:
+    """Get zodiac sign information based on birth date.
+
+    Uses the API's classifier, so cusp birthdays get the same sign from the
+    Sun ingress table as the good-dates endpoints.
+    """
+    return dict(classify_zodiac_sign(birth_date))
 
 
 async def get_date_recommendations(
     dates: list[str], zodiac_sign: Dict[str, Any]
-) -> Dict[str, Dict[str, Any]]:
+) -> DateSpecificAdvice:
     """Get recommendations for specific dates."""
-    # Get personalized recommendations for each date
-    recommendations = await get_personalized_recommendations(
-        "date_recommendations",
+    # Long date lists are analyzed in concurrent chunks
+    return await get_date_advice(
+        dates,
         {
-            "dates": dates,
-            "context": {
-                "numerology_number": 4,  # Will be replaced with actual calculation
-                "zodiac_sign": zodiac_sign["name"],
-                "element": zodiac_sign["element"],
-            },
+            "numerology_number": 4,  # Will be replaced with actual calculation
+            "zodiac_sign": zodiac_sign["name"],
+            "element": zodiac_sign["element"],
         },
     )
-    return recommendations
 
 
 async def get_power_periods(
@@ -46,6 +45,13 @@ async def get_power_periods(
             "numerology_number": 4,  # Will be replaced with actual calculation
         },
     )
+    power_periods = json.loads(power_periods)
+    # JSON mode always returns an object, so the array comes back wrapped
+    if isinstance(power_periods, dict):
+        power_periods = next(
+            (value for value in power_periods.values() if isinstance(value, list)),
+            [],
+        )
     return power_periods
 
 
@@ -76,13 +82,19 @@ async def get_zodiac_recommendations(
     birth_date: str, dates: list[str]
 ) -> Dict[str, Any]:
     """Get zodiac sign recommendations for given dates."""
-    # Get zodiac sign for birth date
-    zodiac_sign = await get_zodiac_sign(birth_date)
-    zodiac_sign = json.loads(zodiac_sign)  # Parse JSON string
-
-    # Get recommendations for dates
-    date_advice = await get_date_recommendations(dates, zodiac_sign)
-    date_advice = json.loads(date_advice)  # Parse JSON string
+    zodiac_sign = get_zodiac_sign(birth_date)
+
+    # The LLM calls only depend on the sign, so run them together; if one
+    # fails the task group cancels the other
+    try:
+        async with asyncio.TaskGroup() as tg:
+            date_advice_task = tg.create_task(
+                get_date_recommendations(dates, zodiac_sign)
+            )
+            power_periods_task = tg.create_task(get_power_periods(dates, zodiac_sign))
+    except ExceptionGroup as e:
+        raise e.exceptions[0] from e
+    date_advice = date_advice_task.result()
 
     # Get recommendations by category
     recommendations = {
@@ -106,7 +118,7 @@ async def get_zodiac_recommendations(
             "Plan investments during auspicious periods",
             "Review finances during clear-minded phases",
         ],
-        "power_periods": await get_power_periods(dates, zodiac_sign),
+        "power_periods": power_periods_task.result(),
         "date_specific_advice": date_advice,
     }
 